@@ -21,6 +21,9 @@ logger = logging.getLogger("app")
 # TraceLog integration: one line added to the existing setup
 # ---------------------------------------------------------------------------
 logging.getLogger().addHandler(TraceLogHandler(capacity=50))
+# DEBUG-heavy production services can skip buffering low-level records
+# entirely while still dumping on every ERROR:
+#     TraceLogHandler(capacity=50, buffer_level=logging.INFO)
 
 
 # ===========================================================================
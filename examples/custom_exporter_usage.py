@@ -4,6 +4,9 @@ Shows how to subclass TraceExporter to forward JSON dumps to any
 destination — in this example, an in-memory list (useful for testing) and
 a simulated JSON-over-HTTP POST to a remote aggregator.
 
+The HTTP exporter uses ``orjson`` and a ``urllib3`` connection pool when they
+are installed, and falls back to the standard library otherwise.
+
 Run:
     python examples/custom_exporter_usage.py
 """
@@ -12,13 +15,29 @@ import json
 import logging
 from typing import List
 from urllib.request import Request, urlopen
-from urllib.error import URLError
 
 from tracelog import TraceLogHandler, trace
 from tracelog.exporter import TraceExporter
 from tracelog.buffer import LogEntry
 from tracelog.context import ContextManager
 
+try:  # Optional: faster JSON encoder that returns UTF-8 bytes directly.
+    import orjson
+
+    def _dumps(obj: dict) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+
+    def _dumps(obj: dict) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+try:  # Optional: keep-alive connection pool instead of one connection per dump.
+    import urllib3
+except ImportError:
+    urllib3 = None
+
 
 # ---------------------------------------------------------------------------
 # Custom Exporter 1: In-Memory Collector (great for unit tests)
@@ -67,6 +86,9 @@ class HttpJsonExporter(TraceExporter):
     In a real deployment this would point to the TraceLog Aggregator service.
     Here we simulate it with a print statement when the HTTP call fails.
 
+    When ``urllib3`` is installed, requests reuse pooled keep-alive
+    connections instead of opening a new TCP (and TLS) connection per dump.
+
     Args:
         endpoint: Full URL of the aggregator endpoint.
         timeout: Request timeout in seconds.
@@ -75,39 +97,52 @@ class HttpJsonExporter(TraceExporter):
     def __init__(self, endpoint: str, timeout: int = 5) -> None:
         self._endpoint = endpoint
         self._timeout = timeout
+        self._pool = (
+            urllib3.PoolManager(maxsize=4, retries=False, timeout=timeout)
+            if urllib3 is not None
+            else None
+        )
 
     def export(self, entries: List[LogEntry]) -> None:
         ctx = ContextManager()
-        payload = json.dumps(
+        payload = _dumps(
             {
                 "trace_id": ctx.get_trace_id(),
                 "span_id": ctx.get_span_id(),
                 "parent_span_id": ctx.get_parent_span_id(),
                 "dsl_lines": [e.dsl_line for e in entries],
-            },
-            ensure_ascii=False,
-        ).encode("utf-8")
-
-        req = Request(
-            self._endpoint,
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
+            }
         )
 
         try:
-            with urlopen(req, timeout=self._timeout) as resp:
-                print(
-                    f"[HttpJsonExporter] Sent {len(entries)} entries → HTTP {resp.status}"
-                )
-        except URLError as exc:
+            status = self._post(payload)
+            print(f"[HttpJsonExporter] Sent {len(entries)} entries → HTTP {status}")
+        except Exception as exc:
             # Do NOT swallow the trace — print the JSON payload as fallback
+            reason = getattr(exc, "reason", exc)
             print(
                 f"[HttpJsonExporter] WARNING: could not reach {self._endpoint} "
-                f"({exc.reason}). JSON dump follows:\n"
+                f"({reason}). JSON dump follows:\n"
             )
             print(payload.decode("utf-8"))
 
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.clear()
+
+    def _post(self, payload: bytes) -> int:
+        """POST ``payload`` to the endpoint and return the HTTP status code."""
+        headers = {"Content-Type": "application/json"}
+        if self._pool is not None:
+            resp = self._pool.request(
+                "POST", self._endpoint, body=payload, headers=headers
+            )
+            return resp.status
+
+        req = Request(self._endpoint, data=payload, headers=headers, method="POST")
+        with urlopen(req, timeout=self._timeout) as resp:
+            return resp.status
+
 
 # ---------------------------------------------------------------------------
 # Business logic (same payment example, reused for clarity)
@@ -8,8 +8,11 @@ Covers:
     - 100% branch coverage target for buffer.py
 """
 
+import gc
 import logging
+import threading
 import time
+import weakref
 
 import pytest
 
@@ -42,6 +45,10 @@ class TestLogEntry:
         with pytest.raises(AttributeError):
             entry.unexpected = "should fail"  # type: ignore[attr-defined]
 
+    def test_log_entry_has_no_instance_dict(self):
+        """LogEntry instances carry no per-instance __dict__."""
+        assert not hasattr(LogEntry(0.0, "x"), "__dict__")
+
 
 # ---------------------------------------------------------------------------
 # ChunkBuffer — basic operations
@@ -73,6 +80,44 @@ class TestChunkBufferBasic:
         buf.push("!! oops", level=logging.ERROR)
         assert buf.snapshot()[0].level == logging.ERROR
 
+    def test_chunk_buffer_accepts_levels_from_min_level(self):
+        buf = ChunkBuffer(min_level=logging.INFO)
+        assert not buf.accepts(logging.DEBUG)
+        assert buf.accepts(logging.INFO)
+        assert ChunkBuffer().accepts(logging.DEBUG)
+
+    def test_chunk_buffer_rejects_non_positive_capacity(self):
+        """capacity must leave room for at least one preallocated slot."""
+        with pytest.raises(ValueError):
+            ChunkBuffer(capacity=0)
+
+    def test_chunk_buffer_renders_deferred_line_on_read(self):
+        """A deferred (render, *args) line is rendered when read back."""
+        buf = ChunkBuffer(capacity=10)
+        buf.push((lambda head, n: f"{head}{n * 2}", ".. ", 21), level=logging.INFO)
+        assert buf.snapshot()[0].dsl_line == ".. 42"
+
+    def test_chunk_buffer_failing_deferred_line_does_not_break_read_back(
+        self, tmp_path
+    ):
+        """A renderer that raises becomes a placeholder; other entries survive."""
+
+        def broken():
+            raise ValueError("bad")
+
+        buf = ChunkBuffer(capacity=2, chunk_dir=tmp_path)
+        buf.push((broken,))
+        buf.push("after")  # fills the buffer: flushed to a chunk file
+        buf.push((broken,))
+
+        lines = [e.dsl_line for e in buf.flash()]
+        assert lines == [
+            "<unrenderable line: ValueError>",
+            "after",
+            "<unrenderable line: ValueError>",
+        ]
+        assert len(buf) == 0
+
     def test_ring_buffer_push_records_monotonic_timestamp(self):
         """Each entry has a non-negative monotonic timestamp."""
         buf = ChunkBuffer()
@@ -121,6 +166,31 @@ class TestChunkBufferFlash:
         buf = ChunkBuffer()
         assert buf.flash() == []
 
+    def test_chunk_buffer_reuses_slots_after_flash(self):
+        """Entries pushed after flash() do not include stale slot contents."""
+        buf = ChunkBuffer(capacity=5)
+        for i in range(3):
+            buf.push(f"old {i}")
+        buf.flash()
+        buf.push("new")
+        assert [e.dsl_line for e in buf.snapshot()] == ["new"]
+
+    def test_chunk_buffer_flash_releases_flashed_lines(self):
+        """After flash(), the buffer no longer references the flashed arguments."""
+
+        class Arg:
+            pass
+
+        arg = Arg()
+        ref = weakref.ref(arg)
+        buf = ChunkBuffer(capacity=10)
+        buf.push((repr, arg))
+        buf.flash()
+
+        del arg
+        gc.collect()
+        assert ref() is None
+
     def test_ring_buffer_flash_preserves_insertion_order(self):
         """flash() returns entries oldest-first."""
         buf = ChunkBuffer(capacity=5)
@@ -129,6 +199,30 @@ class TestChunkBufferFlash:
         entries = buf.flash()
         assert [e.dsl_line for e in entries] == ["0", "1", "2", "3", "4"]
 
+    def test_chunk_buffer_flash_from_other_thread_never_loses_or_blanks_entries(
+        self, tmp_path
+    ):
+        """Concurrent push() and flash() (as in a cross-thread dump) stay consistent."""
+        buf = ChunkBuffer(capacity=64, max_chunks=1000, chunk_dir=tmp_path)
+        total = 20000
+        done = threading.Event()
+
+        def producer():
+            for i in range(total):
+                buf.push(str(i))
+            done.set()
+
+        worker = threading.Thread(target=producer)
+        worker.start()
+        seen = []
+        while not done.is_set():
+            seen.extend(e.dsl_line for e in buf.flash())
+        worker.join()
+        seen.extend(e.dsl_line for e in buf.flash())
+
+        assert None not in seen
+        assert sorted(seen, key=int) == [str(i) for i in range(total)]
+
 
 # ---------------------------------------------------------------------------
 # ChunkBuffer — overflow / eviction
@@ -144,18 +238,33 @@ class TestChunkBufferOverflow:
         buf.push("third")  # Reaches capacity (3), triggers flush
 
         # Memory buffer should be empty
-        assert len(buf._buffer) == 0
+        assert len(buf) == 0
         # One chunk file should be created
         assert len(buf._chunk_files) == 1
         assert buf._chunk_files[0].exists()
 
         buf.push("fourth")
         # Memory buffer has 1, disk has 3
-        assert len(buf._buffer) == 1
+        assert len(buf) == 1
 
         dsl_lines = [e.dsl_line for e in buf.snapshot()]
         assert dsl_lines == ["first", "second", "third", "fourth"]
 
+    def test_chunk_buffer_chunk_file_preserves_fields_and_renders_deferred(
+        self, tmp_path
+    ):
+        """Chunk files hold rendered lines with their level and timestamp."""
+        buf = ChunkBuffer(capacity=2, chunk_dir=str(tmp_path))
+        buf.push("plain", level=logging.INFO)
+        buf.push((str.upper, "deferred"), level=logging.DEBUG)
+
+        entries = buf.flash()
+        assert [(e.dsl_line, e.level) for e in entries] == [
+            ("plain", logging.INFO),
+            ("DEFERRED", logging.DEBUG),
+        ]
+        assert entries[0].timestamp <= entries[1].timestamp
+
     def test_chunk_buffer_flash_merges_chunks_and_memory(self, tmp_path):
         """flash() merges chunks from disk and entries in memory."""
         buf = ChunkBuffer(capacity=2, chunk_dir=str(tmp_path))
@@ -164,14 +273,14 @@ class TestChunkBufferOverflow:
 
         # 5 items, capacity 2 => 2 flushes (4 items), 1 item in memory
         assert len(buf._chunk_files) == 2
-        assert len(buf._buffer) == 1
+        assert len(buf) == 1
 
         entries = buf.flash()
         assert len(entries) == 5
         assert [e.dsl_line for e in entries] == [f"entry {i}" for i in range(5)]
 
         # Everything should be cleared
-        assert len(buf._buffer) == 0
+        assert len(buf) == 0
         assert len(buf._chunk_files) == 0
         assert not any(tmp_path.iterdir())  # directory should be empty
 
@@ -191,6 +300,31 @@ class TestChunkBufferOverflow:
         dsl_lines = [e.dsl_line for e in entries]
         assert dsl_lines == ["entry 2", "entry 3", "entry 4", "entry 5", "entry 6"]
 
+    @pytest.mark.parametrize(
+        "policy, expected",
+        [
+            ("drop_oldest", ["entry 2", "entry 3", "entry 4", "entry 5", "entry 6"]),
+            ("drop_newest", ["entry 0", "entry 1", "entry 2", "entry 3", "entry 6"]),
+        ],
+    )
+    def test_chunk_buffer_chunk_policy_decides_which_chunk_is_dropped(
+        self, tmp_path, policy, expected
+    ):
+        """chunk_policy picks the oldest or the newest chunk to give up; memory is kept."""
+        buf = ChunkBuffer(
+            capacity=2, max_chunks=2, chunk_dir=str(tmp_path), chunk_policy=policy
+        )
+        for i in range(7):
+            buf.push(f"entry {i}")
+
+        assert len(buf._chunk_files) == 2
+        assert [e.dsl_line for e in buf.flash()] == expected
+        assert not any(tmp_path.iterdir())
+
+    def test_chunk_buffer_rejects_unknown_chunk_policy(self):
+        with pytest.raises(ValueError):
+            ChunkBuffer(chunk_policy="block")
+
 
 # ---------------------------------------------------------------------------
 # ChunkBuffer — snapshot() and clear()
@@ -205,6 +339,34 @@ class TestChunkBufferSnapshotAndClear:
         _ = buf.snapshot()
         assert len(buf) == 1
 
+    def test_chunk_buffer_clear_releases_cleared_lines(self):
+        """After clear(), the buffer no longer references the cleared arguments."""
+
+        class Arg:
+            pass
+
+        arg = Arg()
+        ref = weakref.ref(arg)
+        buf = ChunkBuffer(capacity=10)
+        buf.push((repr, arg))
+        buf.clear()
+
+        del arg
+        gc.collect()
+        assert ref() is None
+
+    def test_chunk_buffer_iter_snapshot_matches_snapshot(self, tmp_path):
+        """iter_snapshot() yields the same entries as snapshot(), lazily."""
+        buf = ChunkBuffer(capacity=2, chunk_dir=str(tmp_path))
+        for i in range(3):
+            buf.push(f"entry {i}", level=i)
+
+        it = buf.iter_snapshot()
+        assert not isinstance(it, list)
+        assert list(it) == buf.snapshot()
+        assert [e.dsl_line for e in buf.iter_snapshot()] == ["entry 0", "entry 1", "entry 2"]
+        assert len(buf) == 1
+
     def test_ring_buffer_clear_removes_all_entries(self):
         """clear() empties the buffer without returning entries."""
         buf = ChunkBuffer(capacity=5)
@@ -68,6 +68,17 @@ class TestContextManagerDepth:
         ctx1.increase_depth()
         assert ctx2.get_depth() == 1  # shared ContextVar
 
+    def test_context_manager_instances_have_no_dict(self):
+        """ContextManager is stateless, so instances are __slots__-only."""
+        assert not hasattr(self.ctx, "__dict__")
+
+    def test_exporters_share_one_context_manager(self):
+        """The exporters reuse the module-level instance."""
+        from tracelog import exporter
+        from tracelog.context import _SHARED_CTX
+
+        assert exporter._ctx is _SHARED_CTX
+
 
 # ---------------------------------------------------------------------------
 # Trace ID
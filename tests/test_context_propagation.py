@@ -85,6 +85,27 @@ def test_decorator_generates_span_id_and_restores_parent():
     assert ctx._parent_span_id.get() == ""
 
 
+def test_decorator_restores_trace_id_set_inside_the_call():
+    """A trace_id generated by, or changed inside, a root @trace call does not leak out."""
+    ctx = ContextManager()
+    ctx._trace_id.set("")
+    ctx._span_id.set("")
+    ctx._parent_span_id.set("")
+
+    @trace
+    def root():
+        generated = ctx._trace_id.get()
+        ctx.set_trace_id("overridden")
+        return generated
+
+    assert root() != ""
+    assert ctx._trace_id.get() == ""
+
+    ctx.set_trace_id("caller")
+    assert root() == "caller"
+    assert ctx._trace_id.get() == "caller"
+
+
 def test_span_id_in_json_dump(handler):
     """Test that the JSON dump includes the correct span_id and parent_span_id."""
     logger, stream = handler
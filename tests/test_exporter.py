@@ -1,11 +1,12 @@
 import io
 import json
+import threading
 
 import pytest
 
 from tracelog.buffer import LogEntry
 from tracelog.context import ContextManager
-from tracelog.exporter import FileExporter, StreamExporter
+from tracelog.exporter import AsyncExporter, FileExporter, StreamExporter, TraceExporter
 
 
 def _entries() -> list[LogEntry]:
@@ -44,6 +45,16 @@ class TestStreamExporter:
         assert payload["dsl_lines"] == [".. [INFO] step one", "!! boom"]
         assert payload["timestamp"]
 
+    def test_dump_timestamp_is_utc_iso_second(self, monkeypatch):
+        """The payload timestamp is UTC to the second and reused within a second."""
+        from tracelog import exporter as exporter_mod
+
+        monkeypatch.setattr(exporter_mod.time, "time", lambda: 1773000000.25)
+        first = exporter_mod._now_iso()
+        monkeypatch.setattr(exporter_mod.time, "time", lambda: 1773000000.75)
+        assert exporter_mod._now_iso() is first
+        assert first == "2026-03-08T20:00:00Z"
+
 
 class TestFileExporter:
     def test_file_exporter_appends_json_lines(self, tmp_path):
@@ -81,3 +92,106 @@ class TestFileExporter:
         assert len(lines) == 1
         payload = json.loads(lines[0])
         assert payload["dsl_lines"] == [".. [INFO] step one", "!! boom"]
+
+    def test_file_exporter_rotates_on_tracked_size_across_exports(self, tmp_path):
+        """Rotation triggers from the size recorded after this exporter's own writes."""
+        path = tmp_path / "trace.log"
+        exporter = FileExporter(str(path), max_bytes=1)
+
+        exporter.export(_entries())
+        assert exporter._size == path.stat().st_size
+        exporter.export(_entries())
+
+        backup = path.with_name(path.name + ".bak")
+        assert len(backup.read_text(encoding="utf-8").splitlines()) == 1
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+
+    def test_file_exporter_encodes_non_ascii_with_configured_encoding(self, tmp_path):
+        """Dumps are written as bytes in the exporter's encoding."""
+        path = tmp_path / "trace.log"
+        exporter = FileExporter(str(path), encoding="utf-16")
+
+        exporter.export([LogEntry(1.0, ".. [INFO] café ✓", level=20)])
+        exporter.close()
+        exporter.export([LogEntry(2.0, ".. [INFO] naïve", level=20)])
+        exporter.close()
+
+        lines = path.read_text(encoding="utf-16").splitlines()
+        assert [json.loads(line)["dsl_lines"] for line in lines] == [
+            [".. [INFO] café ✓"],
+            [".. [INFO] naïve"],
+        ]
+
+    def test_file_exporter_keeps_handle_open_until_close(self, tmp_path):
+        """Exports reuse one handle; close() releases it and export() reopens."""
+        path = tmp_path / "trace.log"
+        exporter = FileExporter(str(path))
+
+        exporter.export(_entries())
+        handle = exporter._fh
+        exporter.export(_entries())
+        assert exporter._fh is handle
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+        exporter.close()
+        assert handle.closed and exporter._fh is None
+        exporter.export(_entries())
+        exporter.close()
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+class _RecordingExporter(TraceExporter):
+    def __init__(self):
+        self.calls = []
+        self.closed = False
+
+    def export(self, entries):
+        self.calls.append((ContextManager().get_trace_id(), threading.current_thread(), entries))
+
+    def close(self):
+        self.closed = True
+
+
+class TestAsyncExporter:
+    def test_async_exporter_runs_inner_on_worker_with_caller_context(self):
+        """The inner exporter runs off-thread but sees the caller's trace_id."""
+        inner = _RecordingExporter()
+        exporter = AsyncExporter(inner)
+        token = ContextManager._trace_id.set("caller-trace")
+        try:
+            exporter.export(_entries())
+            exporter.flush()
+        finally:
+            ContextManager._trace_id.reset(token)
+
+        assert len(inner.calls) == 1
+        trace_id, thread, entries = inner.calls[0]
+        assert trace_id == "caller-trace"
+        assert thread is not threading.current_thread()
+        assert entries == _entries()
+        exporter.close()
+        assert inner.closed
+
+    def test_async_exporter_drops_when_queue_full(self):
+        """With overflow='drop', a full queue discards new dumps instead of blocking."""
+        release = threading.Event()
+
+        class SlowExporter(_RecordingExporter):
+            def export(self, entries):
+                release.wait()
+                super().export(entries)
+
+        inner = SlowExporter()
+        exporter = AsyncExporter(inner, queue_size=1, overflow="drop")
+        for _ in range(5):
+            exporter.export(_entries())
+        release.set()
+        exporter.close()
+
+        assert exporter.dropped >= 3
+        assert len(inner.calls) + exporter.dropped == 5
+
+    def test_async_exporter_rejects_unknown_overflow_policy(self):
+        with pytest.raises(ValueError):
+            AsyncExporter(_RecordingExporter(), overflow="spill")
+
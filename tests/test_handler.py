@@ -13,12 +13,18 @@ Covers:
     - Integration scenario A: handler-only (no @trace) dumps on ERROR
 """
 
+import gc
 import io
 import json
 import logging
+import os
 import threading
+import time
+import weakref
 
-from tracelog.handler import TraceLogHandler, get_buffer, _buffer_var
+import pytest
+
+from tracelog.handler import TraceLogHandler, get_buffer, _buffer_registry, _buffer_var
 from tracelog.context import ContextManager
 
 
@@ -113,6 +119,23 @@ class TestGetBuffer:
         assert all("t1" in e.dsl_line for e in buffers["t1"].snapshot())
         assert all("t2" in e.dsl_line for e in buffers["t2"].snapshot())
 
+    def test_registry_tracks_new_buffers_and_drops_collected_ones(self):
+        """A worker's buffer is registered, and leaves the registry once collected."""
+        refs = []
+
+        def worker():
+            buf = get_buffer()
+            assert buf in _buffer_registry
+            refs.append(weakref.ref(buf))
+
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+        gc.collect()
+
+        assert refs[0]() is None
+        assert get_buffer() in _buffer_registry
+
 
 # ---------------------------------------------------------------------------
 # _to_dsl()
@@ -155,6 +178,20 @@ class TestToDsl:
         dsl = self.handler._to_dsl(record)
         assert dsl == "!! critical fail"
 
+    def test_to_dsl_non_string_msg_without_args_is_stringified(self):
+        """A non-str msg with no args still goes through str(), like getMessage()."""
+        record = _make_record("unused", logging.INFO)
+        record.msg = {"k": 1}
+        assert self.handler._to_dsl(record) == ".. [INFO] {'k': 1}"
+
+    def test_to_dsl_custom_level_falls_back_to_level_name(self):
+        """Levels outside the prefix table use their level name, e.g. '.. [Level 15]'."""
+        record = _make_record("custom", 15)
+        dsl = self.handler._to_dsl(record)
+        assert dsl == ".. [Level 15] custom"
+        # Second record hits the cached prefix and renders identically.
+        assert self.handler._to_dsl(_make_record("again", 15)) == ".. [Level 15] again"
+
     def test_to_dsl_applies_indentation_based_on_depth(self):
         """DSL line is indented by 2 spaces per depth level."""
         ContextManager._depth.set(2)
@@ -162,6 +199,12 @@ class TestToDsl:
         dsl = self.handler._to_dsl(record)
         assert dsl.startswith("    ")  # 4 spaces = depth 2
 
+    def test_to_dsl_indents_beyond_precomputed_depths(self):
+        """Depths past the precomputed indent table are still indented correctly."""
+        ContextManager._depth.set(100)
+        dsl = self.handler._to_dsl(_make_record("very deep", logging.INFO))
+        assert dsl == " " * 200 + ".. [INFO] very deep"
+
     def test_to_dsl_includes_exception_class_name_when_exc_info_present(self):
         """When exc_info is set, the exception class name is prepended."""
         try:
@@ -216,6 +259,128 @@ class TestEmit:
 
         assert len(get_buffer()) == 0
 
+    def test_emit_skips_records_below_buffer_level(self):
+        """Records below buffer_level are not buffered, but ERROR still dumps."""
+        handler = TraceLogHandler(
+            capacity=50, dump_stream=self.stream, buffer_level=logging.INFO
+        )
+        handler.emit(_make_record("noisy detail", logging.DEBUG))
+        assert len(get_buffer()) == 0
+
+        handler.emit(_make_record("step", logging.INFO))
+        handler.emit(_make_record("boom", logging.ERROR))
+        payload = _parse_dump(self.stream.getvalue())
+        assert payload["dsl_lines"] == [".. [INFO] step", "!! boom"]
+
+    def test_handle_runs_without_handler_lock_and_honours_filters(self):
+        """handle() emits without a handler-wide lock and still applies filters."""
+        assert self.handler.lock is None
+        self.handler.addFilter(lambda r: r.getMessage() != "drop me")
+
+        assert not self.handler.handle(_make_record("drop me", logging.INFO))
+        assert self.handler.handle(_make_record("keep me", logging.INFO))
+        assert [e.dsl_line for e in get_buffer().snapshot()] == [".. [INFO] keep me"]
+
+    def test_error_logged_from_exporter_does_not_deadlock(self):
+        """An ERROR logged inside export() is buffered for the next dump, not re-dumped."""
+        logger = logging.getLogger("nested_dump_test")
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        logger.handlers.clear()
+
+        class LoggingExporter:
+            def __init__(self):
+                self.dumps = []
+
+            def export(self, entries):
+                self.dumps.append([e.dsl_line for e in entries])
+                logger.error("export failed")
+
+        exporter = LoggingExporter()
+        handler = TraceLogHandler(capacity=50, exporter=exporter)
+        logger.addHandler(handler)
+        def run():
+            logger.error("first")
+            logger.error("second")
+
+        try:
+            # On a worker thread, so a regression fails the test instead of
+            # hanging the suite.
+            worker = threading.Thread(target=run, daemon=True)
+            worker.start()
+            worker.join(timeout=5)
+            assert not worker.is_alive(), "nested ERROR deadlocked _dump()"
+        finally:
+            logger.removeHandler(handler)
+
+        assert exporter.dumps[0] == ["!! first"]
+        assert exporter.dumps[1] == ["!! export failed", "!! second"]
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_forked_child_can_dump_while_parent_thread_is_exporting(self):
+        """Locks held by another thread at fork time are re-created in the child."""
+        exporting = threading.Event()
+        release = threading.Event()
+
+        class BlockingExporter:
+            def __init__(self):
+                self.owner = None
+
+            def export(self, entries):
+                if threading.current_thread() is self.owner:
+                    exporting.set()
+                    release.wait()
+
+        exporter = BlockingExporter()
+        handler = TraceLogHandler(capacity=50, exporter=exporter)
+
+        def dump_in_thread():
+            exporter.owner = threading.current_thread()
+            handler.emit(_make_record("parent boom", logging.ERROR))
+
+        worker = threading.Thread(target=dump_in_thread, daemon=True)
+        worker.start()
+        assert exporting.wait(timeout=5)
+        try:
+            pid = os.fork()
+            if pid == 0:  # child: _dump_lock is held by a thread that is gone
+                try:
+                    handler.emit(_make_record("child boom", logging.ERROR))
+                finally:
+                    os._exit(0)
+
+            deadline = time.monotonic() + 5
+            while True:
+                done, status = os.waitpid(pid, os.WNOHANG)
+                if done or time.monotonic() > deadline:
+                    break
+                time.sleep(0.01)
+            if not done:
+                os.kill(pid, 9)
+                os.waitpid(pid, 0)
+            assert done, "forked child hung on its first ERROR"
+            assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+        finally:
+            release.set()
+            worker.join(timeout=5)
+
+    def test_close_tolerates_exporter_without_close(self):
+        """close() works with a duck-typed exporter that only has export()."""
+
+        class ExportOnly:
+            def __init__(self):
+                self.dumps = []
+
+            def export(self, entries):
+                self.dumps.append(entries)
+
+        exporter = ExportOnly()
+        handler = TraceLogHandler(capacity=50, exporter=exporter)
+        handler.emit(_make_record("boom", logging.ERROR))
+        handler.close()
+        assert len(exporter.dumps) == 1
+
     def test_emit_includes_prior_info_entries_in_dump(self):
         """ERROR dump contains all buffered INFO lines recorded before the error."""
         self.handler.emit(_make_record("step A", logging.INFO))
@@ -278,3 +443,63 @@ class TestIntegrationHandlerOnly:
             logger.removeHandler(handler)
 
         assert post_error_length == 0
+
+
+# ---------------------------------------------------------------------------
+# lazy_format
+# ---------------------------------------------------------------------------
+
+
+class TestLazyFormat:
+    def setup_method(self):
+        self.stream = io.StringIO()
+        _fresh_handler(self.stream)
+        self.handler = TraceLogHandler(
+            capacity=50, dump_stream=self.stream, lazy_format=True
+        )
+
+    def test_lazy_format_dump_matches_eager_format(self):
+        """Deferred records render to the same DSL lines as eager formatting."""
+        info = _make_record("user=%s amount=%d", logging.INFO)
+        info.args = ("bob", 5)
+        self.handler.emit(info)
+        ContextManager._depth.set(1)
+        self.handler.emit(_make_record("nested", logging.DEBUG))
+        ContextManager._depth.set(0)
+        self.handler.emit(_make_record("boom", logging.ERROR))
+
+        payload = _parse_dump(self.stream.getvalue())
+        assert payload["dsl_lines"] == [
+            ".. [INFO] user=bob amount=5",
+            "  .. [DEBUG] nested",
+            "!! boom",
+        ]
+
+    def test_lazy_format_bad_args_do_not_break_dump(self):
+        """A malformed deferred message still renders instead of aborting the dump."""
+        bad = _make_record("needs %d", logging.INFO)
+        bad.args = ("not-a-number",)
+        self.handler.emit(bad)
+        self.handler.emit(_make_record("boom", logging.ERROR))
+
+        payload = _parse_dump(self.stream.getvalue())
+        assert payload["dsl_lines"][0].startswith(".. [INFO] needs %d")
+        assert payload["dsl_lines"][-1] == "!! boom"
+
+    def test_lazy_format_defers_only_records_below_error(self):
+        """Only sub-ERROR records with args are deferred; the rest are pushed formatted."""
+        buf = get_buffer()
+        pushed = []
+        real_push = buf.push
+        buf.push = lambda line, level=0: (pushed.append(line), real_push(line, level))
+        try:
+            step = _make_record("step %d", logging.INFO)
+            step.args = (1,)
+            self.handler.emit(step)
+            self.handler.emit(_make_record("plain", logging.INFO))
+            self.handler.emit(_make_record("boom", logging.ERROR))
+        finally:
+            del buf.push
+
+        assert pushed[0].__class__ is tuple
+        assert pushed[1:] == [".. [INFO] plain", "!! boom"]
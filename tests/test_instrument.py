@@ -5,22 +5,29 @@ Covers:
     - @trace writes << return line to buffer on normal exit
     - @trace writes !! exception line and re-raises on failure
     - Arguments are captured correctly (positional + keyword)
+    - The fast argument formatter agrees with Signature.bind()
     - Return value is captured in << line
+    - @trace(lazy=True) defers argument/return repr() to read-back
+    - async def functions are awaited before << / !! is written
     - Nested @trace calls produce correct indentation hierarchy
     - Exception type and message appear in !! line
     - Buffer is shared with TraceLogHandler (same get_buffer() instance)
     - Integration scenario B: addHandler + @trace produces full DSL tree
 """
 
+import asyncio
+import contextvars
+import inspect
 import io
 import json
 import logging
 
 import pytest
 
+from tracelog.buffer import ChunkBuffer
 from tracelog.context import ContextManager
-from tracelog.handler import TraceLogHandler, get_buffer
-from tracelog.instrument import trace
+from tracelog.handler import TraceLogHandler, _buffer_var, get_buffer
+from tracelog.instrument import _bind_args, _make_arg_formatter, trace
 
 
 def _parse_dump(output: str) -> dict:
@@ -76,6 +83,149 @@ class TestTraceEntryLine:
         assert "a=3" in entry
         assert "b=5" in entry
 
+    def test_trace_entry_reprs_arguments_and_applies_defaults(self):
+        """Arguments are rendered with repr() and unspecified defaults are included."""
+
+        @trace
+        def greet(name, punct="!"):
+            return name + punct
+
+        greet("bob")
+        entry = get_buffer().snapshot()[0].dsl_line
+        assert entry.startswith(">> ")
+        assert "greet(name='bob', punct='!')" in entry
+
+    @pytest.mark.parametrize(
+        "args, kwargs, handled",
+        [
+            ((1,), {}, True),
+            ((1, 2), {}, True),
+            ((1, 2, 3), {}, True),  # exactly every parameter, positionally
+            ((1,), {"c": 3}, True),
+            ((), {"b": 2, "a": 1}, True),
+            ((1, 2, 3, 4), {}, False),  # too many positionals
+            ((1,), {"a": 1}, False),  # duplicate argument
+            ((1,), {"z": 0}, False),  # unknown keyword
+            ((), {}, False),  # missing required argument
+        ],
+    )
+    def test_fast_arg_formatter_matches_signature_bind(self, args, kwargs, handled):
+        """The precomputed formatter renders what Signature.bind() does, or defers to it."""
+
+        def f(self, a, b=2, c=None):
+            pass
+
+        sig = inspect.signature(f)
+        fast = _make_arg_formatter(sig)((object(),) + args, kwargs)
+        if handled:
+            assert fast == _bind_args(sig, (object(),) + args, kwargs)
+        else:
+            assert fast is None
+
+    def test_trace_survives_argument_with_failing_repr(self):
+        """A __repr__ that raises yields '...' instead of breaking the call."""
+
+        class BadRepr:
+            def __repr__(self):
+                raise RuntimeError("no repr")
+
+        @trace
+        def take(x):
+            return 1
+
+        assert take(BadRepr()) == 1
+        entry = get_buffer().snapshot()[0].dsl_line
+        assert "take(...)" in entry
+        assert ContextManager().get_depth() == 0
+
+    def test_trace_truncates_long_argument_reprs(self):
+        """Long reprs are cut to 100 characters ending in '...'."""
+
+        @trace
+        def take(text, items):
+            return None
+
+        take("x" * 10_000, list(range(1_000)))
+        entry = get_buffer().snapshot()[0].dsl_line
+        text_repr = "'" + "x" * 96 + "..."
+        items_repr = repr(list(range(1_000)))[:97] + "..."
+        assert f"take(text={text_repr}, items={items_repr})" in entry
+
+    def test_fast_arg_formatter_memoizes_primitive_calls_by_type(self):
+        """Repeated primitive-only calls reuse one string; equal values of other types do not."""
+
+        def f(self, a, b="x"):
+            pass
+
+        fmt = _make_arg_formatter(inspect.signature(f))
+        first = fmt((object(), 1), {})
+        assert fmt((object(), 1), {}) is first
+        assert fmt((object(), True), {}) == "a=True, b='x'"
+        assert fmt((object(), 1.0), {}) == "a=1.0, b='x'"
+        assert first == "a=1, b='x'"
+
+    def test_fast_arg_formatter_does_not_memoize_long_strings(self):
+        """str/bytes longer than the repr limit are formatted, not cached."""
+
+        def f(a):
+            pass
+
+        fmt = _make_arg_formatter(inspect.signature(f))
+        payload = "x" * 10_000
+        first = fmt((payload,), {})
+        assert first.startswith("a='xxx") and first.endswith("...")
+        assert fmt((payload,), {}) is not first
+        short = fmt(("x",), {})
+        assert fmt(("x",), {}) is short
+
+    def test_fast_arg_formatter_does_not_memoize_with_mutable_default(self):
+        """A mutable default is rendered with its current state on every call."""
+        default = []
+
+        def f(a, items=default):
+            pass
+
+        fmt = _make_arg_formatter(inspect.signature(f))
+        assert fmt((1,), {}) == "a=1, items=[]"
+        default.append(2)
+        assert fmt((1,), {}) == "a=1, items=[2]"
+
+    def test_fast_arg_formatter_not_built_for_var_or_keyword_only_params(self):
+        """Signatures the formatter cannot map are left to Signature.bind()."""
+
+        def var(*args, **kwargs):
+            pass
+
+        def kwonly(a, *, b):
+            pass
+
+        assert _make_arg_formatter(inspect.signature(var)) is None
+        assert _make_arg_formatter(inspect.signature(kwonly)) is None
+
+    def test_trace_skips_call_lines_when_buffer_rejects_debug(self):
+        """With a buffer above DEBUG, >>/<< are not written and args are not repr()'d."""
+        reprs = []
+
+        class Loud:
+            def __repr__(self):
+                reprs.append(self)
+                return "Loud()"
+
+        @trace
+        def fail(x):
+            raise ValueError("nope")
+
+        def run():
+            buf = ChunkBuffer(min_level=logging.INFO)
+            _buffer_var.set(buf)
+            with pytest.raises(ValueError):
+                fail(Loud())
+            return [e.dsl_line for e in buf.snapshot()]
+
+        lines = contextvars.copy_context().run(run)
+        assert lines == ["!! ValueError: nope"]
+        assert reprs == []
+
     def test_trace_entry_qualname_is_used(self):
         """Entry line uses __qualname__ (e.g. 'Class.method') not just __name__."""
 
@@ -121,6 +271,44 @@ class TestTraceReturnLine:
         ret_line = next(line for line in lines if "<<" in line)
         assert "'hello world'" in ret_line
 
+    def test_trace_lazy_defers_repr_until_read_back(self):
+        """@trace(lazy=True) buffers references and repr()s them on read-back."""
+        reprs = []
+
+        class Tracked:
+            def __repr__(self):
+                reprs.append(self)
+                return "Tracked()"
+
+        @trace(lazy=True)
+        def echo(value, flag=True):
+            return value
+
+        echo(Tracked())
+        assert reprs == []
+
+        lines = [e.dsl_line for e in get_buffer().snapshot()]
+        assert len(reprs) == 2
+        assert lines[0].startswith(">> ")
+        assert "echo(value=Tracked(), flag=True)" in lines[0]
+        assert lines[1] == "<< Tracked()"
+
+    def test_trace_lazy_failing_repr_does_not_break_read_back(self):
+        """A lazy return value whose __repr__ raises renders as ``<< ...``."""
+
+        class Broken:
+            def __repr__(self):
+                raise RuntimeError("no repr")
+
+        @trace(lazy=True)
+        def make():
+            return Broken()
+
+        make()
+        lines = [e.dsl_line for e in get_buffer().flash()]
+        assert lines[0].startswith(">> ")
+        assert lines[1] == "<< ..."
+
 
 # ---------------------------------------------------------------------------
 # @trace — exception line
@@ -179,6 +367,105 @@ class TestTraceExceptionLine:
         assert "missing_key" in exc_line
 
 
+# ---------------------------------------------------------------------------
+# @trace — async functions
+# ---------------------------------------------------------------------------
+
+
+class TestTraceAsync:
+    def setup_method(self):
+        _reset_context()
+
+    def test_trace_async_writes_return_line_after_await(self):
+        """For async def, << carries the awaited result and nesting indents."""
+
+        @trace
+        async def inner(n):
+            await asyncio.sleep(0)
+            return n + 1
+
+        @trace
+        async def outer(n):
+            return await inner(n)
+
+        async def main():
+            result = await outer(1)
+            return result, [e.dsl_line for e in get_buffer().snapshot()]
+
+        result, lines = asyncio.run(main())
+
+        assert result == 2
+        assert inspect.iscoroutinefunction(outer)
+        assert lines[0].startswith(">> ") and "outer(n=1)" in lines[0]
+        assert lines[1].startswith("  >> ") and "inner(n=1)" in lines[1]
+        assert lines[2:] == ["  << 2", "<< 2"]
+
+    def test_trace_async_records_exception_and_restores_depth(self):
+        """An exception raised after an await produces !! and is re-raised."""
+
+        @trace
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("late")
+
+        async def main():
+            with pytest.raises(ValueError, match="late"):
+                await fail()
+            return ContextManager().get_depth(), [
+                e.dsl_line for e in get_buffer().snapshot()
+            ]
+
+        depth, lines = asyncio.run(main())
+
+        assert depth == 0
+        assert lines[-1] == "!! ValueError: late"
+
+    def test_trace_async_cancellation_restores_depth(self):
+        """A cancelled traced coroutine (CancelledError) still restores depth."""
+
+        @trace
+        async def slow():
+            await asyncio.sleep(10)
+
+        async def runner():
+            try:
+                await slow()
+            except asyncio.CancelledError:
+                return ContextManager().get_depth()
+
+        async def main():
+            task = asyncio.create_task(runner())
+            await asyncio.sleep(0)
+            task.cancel()
+            return await task
+
+        assert asyncio.run(main()) == 0
+
+    def test_trace_async_gather_keeps_sibling_entry_lines(self):
+        """Sibling tasks at depth 0 share the buffer without clearing it."""
+
+        @trace
+        async def step(n):
+            await asyncio.sleep(0)
+            return n
+
+        async def main():
+            buf = get_buffer()
+            await asyncio.gather(step(1), step(2))
+            return [e.dsl_line for e in buf.snapshot()]
+
+        lines = asyncio.run(main())
+
+        entries = [line for line in lines if line.startswith(">> ")]
+        assert len(entries) == 2
+        assert any("step(n=1)" in line for line in entries)
+        assert any("step(n=2)" in line for line in entries)
+        assert sorted(line for line in lines if line.startswith("<< ")) == [
+            "<< 1",
+            "<< 2",
+        ]
+
+
 # ---------------------------------------------------------------------------
 # @trace — indentation (nested calls)
 # ---------------------------------------------------------------------------
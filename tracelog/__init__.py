@@ -34,11 +34,12 @@ Exported names:
                      (primarily used by tests and advanced integrations).
     StreamExporter:  Writes JSON dumps to a writable stream (default: stderr).
     FileExporter:    Appends JSON dumps to a file on disk, with rotation support.
+    AsyncExporter:   Runs another exporter on a background thread.
 """
 
 from .handler import TraceLogHandler, get_buffer
 from .instrument import trace
-from .exporter import TraceExporter, StreamExporter, FileExporter
+from .exporter import TraceExporter, StreamExporter, FileExporter, AsyncExporter
 
 __all__ = [
     "TraceLogHandler",
@@ -47,5 +48,6 @@ __all__ = [
     "TraceExporter",
     "StreamExporter",
     "FileExporter",
+    "AsyncExporter",
 ]
 __version__ = "0.1.0"
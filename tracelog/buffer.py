@@ -7,47 +7,80 @@ On error, TraceLogHandler calls ``flash()`` to retrieve all current entries
 and merges them with previously flushed chunks for the full execution narrative.
 
 Design decisions:
-    - ``List[LogEntry]`` provides fast appends and snapshots.
+    - Entries are stored structure-of-arrays style in three preallocated
+      columns (timestamps, DSL lines, levels) plus a write index, so a push
+      allocates no per-entry object. ``LogEntry`` tuples are materialized
+      only when entries are read back.
     - Instead of evicting old entries (like a ring buffer), we return a boolean
       overflow flag from ``push()`` so the Handler can flush to persistent storage,
       guaranteeing zero information loss.
     - ``flash()`` combines snapshot and clear in a single call.
+    - Once ``max_chunks`` is reached, ``chunk_policy`` decides which side of
+      the history is given up: ``"drop_oldest"`` (default) deletes the oldest
+      chunk file, ``"drop_newest"`` discards the new chunk so the beginning
+      of the execution is kept. Entries still in memory are never dropped.
 """
 
-from typing import Dict, Any, List
-import time
+from array import array
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 import json
+import os
+import threading
+import time
+import weakref
 from pathlib import Path
 
 
-class LogEntry:
-    """An immutable record stored inside a RingBuffer.
+# Bound once so push() skips the ``time`` module attribute lookup.
+_monotonic_ns = time.monotonic_ns
+
+# Accepted values for ChunkBuffer(chunk_policy=...).
+CHUNK_POLICIES = ("drop_oldest", "drop_newest")
+
+# A Trace-DSL line whose formatting has been deferred: ``(render, *args)``.
+# It is rendered as ``render(*args)`` only when the entry is read back.
+DeferredLine = Tuple[Any, ...]
+
+
+def _render(line: Union[str, DeferredLine]) -> str:
+    """Return ``line`` as a string, rendering it first if it was deferred.
+
+    Deferred lines run producer code (``%``-formatting, ``repr()`` of user
+    objects) at read-back time. A renderer that raises must not abort the
+    whole flash or chunk flush, so it is replaced by a placeholder naming
+    the error.
+    """
+    if line.__class__ is str:
+        return line
+    try:
+        return line[0](*line[1:])
+    except Exception as exc:
+        return f"<unrenderable line: {exc.__class__.__name__}>"
+
+
+class LogEntry(NamedTuple):
+    """An immutable record stored inside a ChunkBuffer.
 
     Each entry captures the DSL-formatted log line, the log level, and a
     monotonic timestamp so that entries can be ordered and timed when needed.
 
+    LogEntry is a ``typing.NamedTuple``: construction is a single tuple
+    allocation with no ``__init__`` dispatch, instances carry no ``__dict__``,
+    and fields are read-only.
+
     Attributes:
-        timestamp (float): Monotonic clock value at the time of creation,
-            as returned by ``time.monotonic()``. Not wall-clock time.
+        timestamp (float): Monotonic clock value at the time of creation, in
+            seconds on the ``time.monotonic()`` scale. Not wall-clock time.
         dsl_line (str): The formatted Trace-DSL string, e.g. ``"  .. [INFO] msg"``.
         level (int): The ``logging`` level constant (e.g. ``logging.DEBUG = 10``).
             Stored for potential downstream filtering without re-parsing the line.
+            Defaults to 0 (NOTSET).
     """
 
-    __slots__ = ("timestamp", "dsl_line", "level")
-
-    def __init__(self, timestamp: float, dsl_line: str, level: int = 0) -> None:
-        """Create a new LogEntry.
-
-        Args:
-            timestamp: Monotonic timestamp at the moment the entry was created.
-            dsl_line: Pre-formatted Trace-DSL string to store.
-            level: Logging level integer corresponding to the original record.
-                Defaults to 0 (NOTSET).
-        """
-        self.timestamp = timestamp
-        self.dsl_line = dsl_line
-        self.level = level
+    timestamp: float
+    dsl_line: str
+    level: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialize entry to a JSON-compatible dictionary.
@@ -78,6 +111,37 @@ class LogEntry:
         return f"LogEntry({self.timestamp:.3f}, {self.dsl_line!r})"
 
 
+def _materialize(timestamps: array, lines: List[Any], levels: array) -> List[LogEntry]:
+    """Build LogEntry tuples from detached columns, in insertion order."""
+    return list(
+        map(
+            LogEntry,
+            [ns / 1e9 for ns in timestamps],
+            map(_render, lines),
+            levels,
+        )
+    )
+
+
+# Every live ChunkBuffer, so a forked child can replace their locks.
+_live_buffers: "weakref.WeakSet[ChunkBuffer]" = weakref.WeakSet()
+
+
+def _reinit_locks_after_fork() -> None:
+    """Give every buffer a fresh lock in a forked child.
+
+    ``fork()`` copies a lock in whatever state it was in, and the thread
+    holding it does not exist in the child, so a buffer locked at fork time
+    would block the child's first push or flash forever.
+    """
+    for buf in list(_live_buffers):
+        buf._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_locks_after_fork)
+
+
 class ChunkBuffer:
     """Fixed-capacity chunk buffer for Trace-DSL LogEntry objects.
 
@@ -87,10 +151,13 @@ class ChunkBuffer:
     Upon an error dump, all disk chunks and the remaining memory buffer are merged.
 
     Thread-safety note:
-        Each thread owns its own ChunkBuffer (via ``contextvars.ContextVar``),
-        so concurrent writes to the *same* buffer do not occur in the normal
-        execution model. If a buffer is deliberately shared across threads,
-        callers must add their own locking.
+        Each thread pushes only to its own ChunkBuffer (via
+        ``contextvars.ContextVar``), but an ERROR in any thread makes
+        ``TraceLogHandler._dump()`` flash *every* registered buffer from that
+        thread. A per-buffer lock therefore guards the columns, ``_size``,
+        and the chunk file list. It is held only for the index/column swaps,
+        never while rendering deferred lines or doing file I/O, so a
+        ``__repr__`` that logs cannot deadlock against it.
 
     Example:
         >>> buf = ChunkBuffer(capacity=2)
@@ -108,6 +175,8 @@ class ChunkBuffer:
         capacity: int = 200,
         max_chunks: int = 50,
         chunk_dir: str = ".tracelog/chunks",
+        chunk_policy: str = "drop_oldest",
+        min_level: int = 0,
     ) -> None:
         """Initialise the buffer with the given maximum capacity.
 
@@ -117,46 +186,125 @@ class ChunkBuffer:
             max_chunks: Maximum number of chunk files to keep per buffer to
                 prevent unbounded disk growth. Defaults to 50.
             chunk_dir: Directory where chunk temp files are stored.
+            chunk_policy: What to give up once ``max_chunks`` chunk files
+                exist. ``"drop_oldest"`` deletes the oldest chunk to make room;
+                ``"drop_newest"`` discards the chunk being flushed, keeping the
+                start of the execution. Defaults to ``"drop_oldest"``.
+            min_level: Lowest level producers should write; see ``accepts()``.
+                Defaults to 0 (accept everything).
+
+        Raises:
+            ValueError: If ``capacity`` is less than 1 or ``chunk_policy`` is
+                not one of ``CHUNK_POLICIES``.
         """
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        if chunk_policy not in CHUNK_POLICIES:
+            raise ValueError(
+                f"chunk_policy must be one of {CHUNK_POLICIES}, got {chunk_policy!r}"
+            )
         self._capacity = capacity
         self._max_chunks = max_chunks
         self._chunk_dir = Path(chunk_dir)
-
-        self._buffer: List[LogEntry] = []
-        self._chunk_files: List[Path] = []
-
-    def push(self, dsl_line: str, level: int = 0) -> None:
+        self._drop_newest = chunk_policy == "drop_newest"
+        self._min_level = min_level
+
+        # Structure-of-arrays storage: three preallocated parallel columns plus
+        # a write index. push() performs three indexed stores and allocates no
+        # per-entry object; LogEntry tuples are only built when entries are
+        # read back (flash/snapshot/chunk flush).
+        # Timestamps are raw time.monotonic_ns() integers; they are converted
+        # to float seconds only when LogEntry tuples are materialized.
+        self._timestamps = array("q", [0]) * capacity
+        self._lines: List[Union[str, DeferredLine, None]] = [None] * capacity
+        self._levels = array("i", [0]) * capacity
+        self._size = 0
+        # deque so that evicting the oldest chunk is O(1) instead of list.pop(0).
+        self._chunk_files: Deque[Path] = deque()
+        # Guards the columns, _size and _chunk_files; see the class docstring.
+        self._lock = threading.Lock()
+        _live_buffers.add(self)
+
+    def push(self, dsl_line: Union[str, DeferredLine], level: int = 0) -> None:
         """Append a new Trace-DSL entry to the buffer.
 
         If the buffer reaches its capacity, memory contents are automatically
         flushed to a chunk file on disk.
 
         Args:
-            dsl_line: The formatted Trace-DSL string to store (e.g. ``">> pay(x=1)"``).
+            dsl_line: The formatted Trace-DSL string to store (e.g. ``">> pay(x=1)"``),
+                or a deferred ``(render, *args)`` tuple. Deferred lines are
+                rendered as ``render(*args)`` only when the entry is read back
+                (flash, snapshot, or chunk flush), so entries that are never
+                dumped never pay the formatting cost.
             level: The logging level integer for the entry. Defaults to 0 (NOTSET).
         """
-        self._buffer.append(LogEntry(time.monotonic(), dsl_line, level))
-        if len(self._buffer) >= self._capacity:
-            self._flush_to_chunk()
+        with self._lock:
+            size = self._size
+            self._timestamps[size] = _monotonic_ns()
+            self._lines[size] = dsl_line
+            self._levels[size] = level
+            self._size = size = size + 1
+            if size < self._capacity:
+                return
+            columns = self._take_columns()
+        self._flush_to_chunk(*columns)
+
+    def accepts(self, level: int) -> bool:
+        """Return whether entries at ``level`` are wanted in this buffer.
+
+        ``push()`` does not check this itself; producers call it first so
+        they can skip building a line (e.g. ``repr()`` of arguments) that
+        the buffer's configuration would not keep.
+
+        Args:
+            level: The logging level of the entry about to be produced.
+        """
+        return level >= self._min_level
+
+    def _take_columns(self) -> Tuple[array, List[Any], array]:
+        """Detach the occupied slots and reset the buffer to empty.
+
+        Must be called with ``_lock`` held. The line column is handed off
+        whole and replaced with a fresh one, so no slot keeps a reference to
+        a (possibly deferred) line after it has been taken.
 
-    def _flush_to_chunk(self) -> None:
-        """Serialize current buffer to a disk chunk and clear memory."""
-        if not self._buffer:
+        Returns:
+            ``(timestamps, lines, levels)`` for the occupied slots, oldest first.
+        """
+        size = self._size
+        columns = (self._timestamps[:size], self._lines[:size], self._levels[:size])
+        self._lines = [None] * self._capacity
+        self._size = 0
+        return columns
+
+    def _flush_to_chunk(self, timestamps: array, lines: List[Any], levels: array) -> None:
+        """Serialize detached columns (see ``_take_columns()``) to a disk chunk."""
+        if not lines:
+            return
+        if self._drop_newest and len(self._chunk_files) >= self._max_chunks:
             return
 
         self._chunk_dir.mkdir(parents=True, exist_ok=True)
         filename = f"chunk_{id(self)}_{time.time_ns()}.json"
         filepath = self._chunk_dir / filename
 
+        # Serialize straight from the columns: the same dicts as
+        # LogEntry.to_dict(), without building a LogEntry per row first.
+        rows = [
+            {"timestamp": ns / 1e9, "dsl_line": _render(line), "level": level}
+            for ns, line, level in zip(timestamps, lines, levels)
+        ]
         with open(filepath, "w", encoding="utf-8") as f:
-            json.dump([e.to_dict() for e in self._buffer], f, indent=2)
-
-        self._buffer.clear()
-        self._chunk_files.append(filepath)
+            json.dump(rows, f, indent=2)
 
         # Evict oldest chunk if exceeding max_chunks
-        while len(self._chunk_files) > self._max_chunks:
-            oldest = self._chunk_files.pop(0)
+        with self._lock:
+            self._chunk_files.append(filepath)
+            evicted = []
+            while len(self._chunk_files) > self._max_chunks:
+                evicted.append(self._chunk_files.popleft())
+        for oldest in evicted:
             try:
                 oldest.unlink(missing_ok=True)
             except OSError:
@@ -173,8 +321,13 @@ class ChunkBuffer:
             A list of all LogEntry objects in insertion order.
             The buffer is cleared.
         """
+        with self._lock:
+            chunk_files = list(self._chunk_files)
+            self._chunk_files.clear()
+            columns = self._take_columns()
+
         all_entries = []
-        for filepath in self._chunk_files:
+        for filepath in chunk_files:
             try:
                 with open(filepath, "r", encoding="utf-8") as f:
                     data = json.load(f)
@@ -185,10 +338,8 @@ class ChunkBuffer:
                 filepath.unlink(missing_ok=True)
             except OSError:
                 pass
-        self._chunk_files.clear()
 
-        all_entries.extend(self._buffer)
-        self._buffer.clear()
+        all_entries.extend(_materialize(*columns))
         return all_entries
 
     def snapshot(self) -> List[LogEntry]:
@@ -199,27 +350,60 @@ class ChunkBuffer:
         Returns:
             A list of all current LogEntry objects (disk + memory) in insertion order.
         """
-        all_entries = []
-        for filepath in self._chunk_files:
+        return list(self.iter_snapshot())
+
+    def iter_snapshot(self) -> Iterator[LogEntry]:
+        """Iterate over all entries without clearing the buffer or disk chunks.
+
+        Same entries and order as ``snapshot()``, but each LogEntry is built
+        only when the iterator reaches it, so callers that just scan the
+        entries skip the intermediate list. When iteration starts, the chunk
+        file list and the occupied in-memory slots are copied under the
+        buffer lock, so concurrent pushes are safe but are not seen by this
+        iterator. A chunk file deleted in the meantime (by ``flash()``,
+        ``clear()``, or eviction) is skipped.
+
+        Yields:
+            LogEntry objects (disk chunks first, then memory) in insertion order.
+        """
+        with self._lock:
+            chunk_files = list(self._chunk_files)
+            size = self._size
+            timestamps = self._timestamps[:size]
+            lines = self._lines[:size]
+            levels = self._levels[:size]
+
+        for filepath in chunk_files:
             try:
                 with open(filepath, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                    all_entries.extend(LogEntry.from_dict(d) for d in data)
             except Exception:
-                pass
-        all_entries.extend(self._buffer)
-        return all_entries
+                continue
+            for d in data:
+                yield LogEntry.from_dict(d)
+
+        for ns, line, level in zip(timestamps, lines, levels):
+            yield LogEntry(ns / 1e9, _render(line), level)
 
     def clear(self) -> None:
         """Remove all entries from the memory buffer and delete disk chunks."""
-        self._buffer.clear()
-        for filepath in self._chunk_files:
+        with self._lock:
+            # Like flash(), start a fresh line column so cleared deferred
+            # lines stop keeping their log arguments alive. The old column is
+            # released after the lock, in case dropping it runs a __del__
+            # that logs into this buffer.
+            stale = self._lines
+            self._lines = [None] * self._capacity
+            self._size = 0
+            chunk_files = list(self._chunk_files)
+            self._chunk_files.clear()
+        del stale
+        for filepath in chunk_files:
             try:
                 filepath.unlink(missing_ok=True)
             except OSError:
                 pass
-        self._chunk_files.clear()
 
     def __len__(self) -> int:
         """Return the current number of entries in memory buffer (ignores chunks limits)."""
-        return len(self._buffer)
+        return self._size
@@ -25,10 +25,21 @@ without any explicit locking.
 """
 
 import contextvars
-import uuid
+import random
 from typing import Optional
 
 
+def _new_id() -> str:
+    """Return a random 8-character lowercase hex ID for traces and spans.
+
+    Same 32 bits of randomness as the first 8 hex digits of a UUID4, without
+    building and formatting the full 128-bit UUID. The ``random`` module
+    reseeds itself in forked children, so worker processes do not repeat
+    their parent's IDs.
+    """
+    return f"{random.getrandbits(32):08x}"
+
+
 class ContextManager:
     """Tracks trace IDs, span IDs, and call-stack depth for the current context.
 
@@ -61,6 +72,10 @@ class ContextManager:
         0
     """
 
+    # No per-instance state: every instance is a view over the class-level
+    # ContextVars below, so instances carry no __dict__.
+    __slots__ = ()
+
     _trace_id: contextvars.ContextVar[str] = contextvars.ContextVar(
         "tracelog_trace_id", default=""
     )
@@ -74,16 +89,23 @@ class ContextManager:
         "tracelog_depth", default=0
     )
 
+    # Bound get/set of the ContextVars above, so the hot methods do one
+    # attribute lookup per access instead of two (``self._depth.get``).
+    _depth_get = _depth.get
+    _depth_set = _depth.set
+    _trace_id_get = _trace_id.get
+    _span_id_get = _span_id.get
+
     def get_span_id(self) -> str:
         """Return the current Span ID, generating one if absent.
 
         Span IDs are distinct from Trace IDs. Calling this method also ensures
         that a Trace ID exists for the current execution flow.
         """
-        sid = self._span_id.get()
+        sid = self._span_id_get()
         if not sid:
             self.get_trace_id()
-            sid = str(uuid.uuid4())[:8]
+            sid = _new_id()
             self._span_id.set(sid)
         return sid
 
@@ -121,7 +143,7 @@ class ContextManager:
     def get_trace_id(self) -> str:
         """Return the Trace ID for the current context, generating one if absent.
 
-        The ID is a shortened UUID4 (first 8 hex characters) that uniquely
+        The ID is 8 random hex characters (32 bits) that uniquely
         identifies a logical execution flow within a process. It is generated
         lazily so that contexts that never call this method incur no overhead.
 
@@ -134,9 +156,9 @@ class ContextManager:
             >>> len(tid)
             8
         """
-        tid = self._trace_id.get()
+        tid = self._trace_id_get()
         if not tid:
-            tid = str(uuid.uuid4())[:8]
+            tid = _new_id()
             self._trace_id.set(tid)
         return tid
 
@@ -148,25 +170,31 @@ class ContextManager:
             function frames are currently on the call stack. 0 means we are
             at the top level (no active @trace frames).
         """
-        return self._depth.get()
+        return self._depth_get()
 
     def increase_depth(self) -> None:
         """Increment the call-stack depth by one.
 
-        Called by the @trace decorator immediately after recording a function
-        entry (``>>`` DSL line) so that nested calls appear indented relative
-        to their caller.
+        Call immediately after recording a function entry (``>>`` DSL line)
+        so that nested calls appear indented relative to their caller.
         """
-        self._depth.set(self._depth.get() + 1)
+        self._depth_set(self._depth_get() + 1)
 
     def decrease_depth(self) -> None:
         """Decrement the call-stack depth by one, clamped at zero.
 
-        Called by the @trace decorator on both normal return and exception paths
-        to restore the depth to the level of the caller. The floor of 0 prevents
+        Call on both normal return and exception paths to restore the depth
+        to the level of the caller. The floor of 0 prevents
         accidental negative indentation if decrease is called more times than
         increase (e.g. in re-entrant or error-recovery scenarios).
         """
-        current = self._depth.get()
+        current = self._depth_get()
         if current > 0:
-            self._depth.set(current - 1)
+            self._depth_set(current - 1)
+
+
+# Process-wide instance used by the exporters to read the trace/span IDs for
+# a dump. ContextManager holds no state of its own, so one object serves every
+# exporter. The handler and @trace do not use it: they bind the ContextVar
+# accessors directly.
+_SHARED_CTX = ContextManager()
@@ -1,10 +1,12 @@
 """exporter.py - Pluggable dump target for Trace-DSL output.
 
-This module defines the TraceExporter protocol and provides two concrete
+This module defines the TraceExporter protocol and provides concrete
 implementations for Phase 1:
 
     StreamExporter  — writes a JSON dump to any writable stream (default: stderr).
     FileExporter    — appends each JSON dump to a file on disk, with optional rotation.
+    AsyncExporter   — wraps another exporter and runs it on a background thread,
+                      so the thread that logged the ERROR only pays a queue put.
 
 By accepting a TraceExporter via TraceLogHandler(exporter=...), callers can swap
 the dump destination without touching any other SDK code.
@@ -19,18 +21,21 @@ Typical usage::
     logging.getLogger().addHandler(handler)
 """
 
+import codecs
+import contextvars
 import os
 import json
+import queue
 import sys
+import threading
+import time
+import traceback
 from abc import ABC, abstractmethod
-from datetime import datetime, timezone
-from typing import Any, List
+from operator import itemgetter
+from typing import Any, BinaryIO, List, Optional
 
 from .buffer import LogEntry
-from .context import ContextManager
-
-# Shared context manager instance to read span IDs.
-_ctx = ContextManager()
+from .context import _SHARED_CTX as _ctx
 
 
 class TraceExporter(ABC):
@@ -61,10 +66,35 @@ class TraceExporter(ABC):
                 if the buffer was cleared before the error was recorded.
         """
 
+    def close(self) -> None:
+        """Release any resources held by the exporter.
+
+        Called by ``TraceLogHandler.close()`` (and therefore by
+        ``logging.shutdown()`` at interpreter exit). The default
+        implementation does nothing.
+        """
+
+
+# LogEntry is a tuple: fetching the line by index skips the per-entry
+# field-descriptor lookup of ``entry.dsl_line``.
+_dsl_line = itemgetter(1)
+
+# (second, formatted string) of the last dump timestamp. Dumps tend to come in
+# bursts, and the string only changes once per second.
+_ts_cache = [0, ""]
+
+
+def _now_iso() -> str:
+    """Return the current UTC time as ``YYYY-MM-DDTHH:MM:SSZ``, cached per second."""
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        _ts_cache[:] = [t, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t))]
+    return _ts_cache[1]
+
 
 def _build_dump_payload(entries: List[LogEntry]) -> dict[str, Any]:
     """Build the canonical JSON dump payload for a flushed buffer."""
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    timestamp = _now_iso()
     trace_id = _ctx.get_trace_id()
     span_id = _ctx.get_span_id()
     parent_span_id = _ctx.get_parent_span_id()
@@ -73,7 +103,7 @@ def _build_dump_payload(entries: List[LogEntry]) -> dict[str, Any]:
         "span_id": span_id,
         "parent_span_id": parent_span_id,
         "timestamp": timestamp,
-        "dsl_lines": [entry.dsl_line for entry in entries],
+        "dsl_lines": list(map(_dsl_line, entries)),
     }
 
 
@@ -130,7 +160,8 @@ class FileExporter(TraceExporter):
     log files incrementally.
 
     The file and any missing parent directories are created automatically
-    on first export.
+    on first export. The file stays open between exports (each dump is
+    flushed as soon as it is written) and is released by ``close()``.
 
     Output format (appended to file)::
 
@@ -143,6 +174,15 @@ class FileExporter(TraceExporter):
         _max_bytes (int): Soft size limit before the file is rotated.
             0 means no rotation.
         _encoding (str): File encoding. Defaults to ``"utf-8"``.
+        _size (Optional[int]): File size observed right after this exporter's
+            last write, or None before the first write. Lets rotation skip
+            the ``stat()`` call while the file is known to be under the limit.
+        _fh (Optional[BinaryIO]): Binary append handle kept open between
+            exports, or None until the first export and after rotation or
+            ``close()``.
+        _encoder (Optional[codecs.IncrementalEncoder]): Encoder for the open
+            handle. Kept per handle so a byte-order mark is written at most
+            once, at the start of a new file.
 
     Example:
         >>> from tracelog.exporter import FileExporter
@@ -176,6 +216,9 @@ class FileExporter(TraceExporter):
         self._path = path
         self._max_bytes = max_bytes
         self._encoding = encoding
+        self._size: Optional[int] = None
+        self._fh: Optional[BinaryIO] = None
+        self._encoder: Optional[codecs.IncrementalEncoder] = None
 
     def export(self, entries: List[LogEntry]) -> None:
         """Append a JSON dump to the configured file.
@@ -187,14 +230,35 @@ class FileExporter(TraceExporter):
         Args:
             entries: Ordered list of LogEntry objects from the flushed buffer.
         """
-        self._ensure_dir()
         if self._max_bytes > 0:
             self._rotate_if_needed()
 
         payload = _build_dump_payload(entries)
 
-        with open(self._path, "a", encoding=self._encoding) as f:
-            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        f = self._fh
+        if f is None:
+            self._ensure_dir()
+            f = self._fh = open(self._path, "ab")
+            self._encoder = codecs.getincrementalencoder(self._encoding)()
+            if f.tell():
+                # Appending: do not write another byte-order mark mid-file.
+                self._encoder.setstate(0)
+        # Encoded once here; a binary handle has no text-codec layer, and
+        # tell() below is an exact byte offset.
+        f.write(self._encoder.encode(json.dumps(payload, ensure_ascii=False) + "\n"))
+        # Dumps are rare and matter most right before a crash, so each one
+        # reaches the OS immediately rather than waiting in the buffer.
+        f.flush()
+        if self._max_bytes > 0:
+            # Append mode writes at end-of-file, so the position after the
+            # write is the current file size, including other writers.
+            self._size = f.tell()
+
+    def close(self) -> None:
+        """Close the file handle. A later ``export()`` reopens the file."""
+        f, self._fh = self._fh, None
+        if f is not None:
+            f.close()
 
     # ---------------------------------------------------------------------- #
     # Private helpers
@@ -208,13 +272,132 @@ class FileExporter(TraceExporter):
     def _rotate_if_needed(self) -> None:
         """Rotate the log file if it exceeds ``_max_bytes``.
 
-        The current file is moved to ``<path>.bak``, replacing any previous
-        backup. A new (empty) file will be created by the next ``export()``
-        call.
+        The open handle is closed and the current file is moved to
+        ``<path>.bak``, replacing any previous backup. A new (empty) file is
+        then opened by ``export()``.
+
+        The size recorded after the previous write is checked first; the file
+        is only ``stat()``-ed when that size has reached the limit (to confirm
+        it against other writers or an external rotation) or before the
+        first write.
         """
+        if self._size is not None and self._size < self._max_bytes:
+            return
         try:
             if os.path.getsize(self._path) >= self._max_bytes:
+                self.close()
                 backup = self._path + ".bak"
                 os.replace(self._path, backup)
         except FileNotFoundError:
             pass  # File does not yet exist — nothing to rotate.
+
+
+# Sentinel placed on the AsyncExporter queue to stop the worker thread.
+_STOP = object()
+
+
+class AsyncExporter(TraceExporter):
+    """Run another exporter on a single background thread.
+
+    ``export()`` only enqueues the flushed entries; a daemon worker thread
+    dequeues them and calls the wrapped exporter. The thread that logged the
+    ERROR therefore never blocks on file or network I/O.
+
+    The caller's ``contextvars`` context is captured at enqueue time and the
+    wrapped exporter runs inside it, so trace/span IDs in the dump payload
+    are those of the thread that triggered the dump, not of the worker.
+
+    Overflow policy (when ``queue_size`` dumps are already pending):
+        ``"drop"``  — discard the new dump and count it in ``dropped``
+                      (lowest latency for the application thread).
+        ``"block"`` — wait for room in the queue (no dump is ever lost).
+
+    Attributes:
+        dropped (int): Number of dumps discarded under the ``"drop"`` policy.
+
+    Example:
+        >>> from tracelog.exporter import AsyncExporter, FileExporter
+        >>> exporter = AsyncExporter(FileExporter("./trace.log"), overflow="block")
+        >>> handler = TraceLogHandler(exporter=exporter)
+    """
+
+    def __init__(
+        self,
+        exporter: TraceExporter,
+        queue_size: int = 1024,
+        overflow: str = "drop",
+    ) -> None:
+        """Start the background worker thread.
+
+        Args:
+            exporter: The exporter that performs the actual I/O.
+            queue_size: Maximum number of pending dumps. Defaults to 1024.
+            overflow: ``"drop"`` or ``"block"``; see the class docstring.
+                Defaults to ``"drop"``.
+
+        Raises:
+            ValueError: If ``overflow`` is not ``"drop"`` or ``"block"``.
+        """
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"overflow must be 'drop' or 'block', got {overflow!r}")
+        self._exporter = exporter
+        self._overflow = overflow
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self.dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name="tracelog-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, entries: List[LogEntry]) -> None:
+        """Queue the entries for export on the background thread.
+
+        After ``close()``, entries are exported synchronously instead.
+
+        Args:
+            entries: Ordered list of LogEntry objects from the flushed buffer.
+        """
+        if self._closed:
+            self._exporter.export(entries)
+            return
+        item = (contextvars.copy_context(), entries)
+        if self._overflow == "block":
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until every queued dump has been exported."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Export all pending dumps, stop the worker, and close the wrapped exporter."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._exporter.close()
+
+    # ---------------------------------------------------------------------- #
+    # Private helpers
+    # ---------------------------------------------------------------------- #
+
+    def _run(self) -> None:
+        """Worker loop: export queued dumps until the stop sentinel arrives."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                ctx, entries = item
+                ctx.run(self._exporter.export, entries)
+            except Exception:
+                # A failing export must not kill the worker thread.
+                traceback.print_exc()
+            finally:
+                self._queue.task_done()
@@ -25,9 +25,12 @@ Typical usage:
 
 import logging
 import os
+import sys
 import threading
+import traceback
 import weakref
 from contextvars import ContextVar
+from operator import itemgetter
 from typing import Optional
 
 from .buffer import ChunkBuffer, LogEntry
@@ -38,28 +41,53 @@ from .exporter import TraceExporter, StreamExporter
 # Per-thread / per-coroutine buffer isolation via ContextVar.
 # ---------------------------------------------------------------------------
 _buffer_var: ContextVar[ChunkBuffer] = ContextVar("tracelog_buffer")
+_buffer_get = _buffer_var.get
 
 # ---------------------------------------------------------------------------
 # Global buffer registry.
 #
-# Every ChunkBuffer created by get_buffer() registers itself here as a weakref.
+# Every ChunkBuffer created by get_buffer() is added to this WeakSet.
 # TraceLogHandler._dump() iterates this registry on every ERROR to collect
 # all thread buffers — including worker threads that never call logger.error()
 # themselves (e.g. ThreadPoolExecutor workers).
 #
-# Weakrefs prevent the registry from keeping buffers alive past their natural
-# lifetime. Dead refs are pruned lazily on each new buffer registration.
+# Weak references prevent the registry from keeping buffers alive past their
+# natural lifetime. The WeakSet drops each entry when its buffer is collected,
+# so registering a buffer is O(1) no matter how many contexts came before.
 # ---------------------------------------------------------------------------
 _registry_lock: threading.Lock = threading.Lock()
-_buffer_registry: set[weakref.ref] = set()
+_buffer_registry: "weakref.WeakSet[ChunkBuffer]" = weakref.WeakSet()
 
 
 def _register_buffer(buf: ChunkBuffer) -> None:
-    """Register a new buffer in the global registry, pruning dead refs first."""
+    """Register a new buffer in the global registry."""
     with _registry_lock:
-        dead = {ref for ref in _buffer_registry if ref() is None}
-        _buffer_registry.difference_update(dead)
-        _buffer_registry.add(weakref.ref(buf))
+        _buffer_registry.add(buf)
+
+
+# ---------------------------------------------------------------------------
+# Fork safety.
+#
+# logging re-creates each handler's ``self.lock`` in a forked child. This
+# handler installs none, so the locks that do its job — _registry_lock and
+# every handler's _dump_lock — are re-created here instead. A lock held by
+# another thread at fork time would otherwise block the child's first ERROR
+# forever. (ChunkBuffer re-creates its own locks in buffer.py.)
+# ---------------------------------------------------------------------------
+_handlers: "weakref.WeakSet[TraceLogHandler]" = weakref.WeakSet()
+
+
+def _reinit_locks_after_fork() -> None:
+    """Replace the registry and dump locks with fresh ones in a forked child."""
+    global _registry_lock
+    _registry_lock = threading.Lock()
+    for handler in list(_handlers):
+        handler._dump_lock = threading.Lock()
+        handler._dumping = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_locks_after_fork)
 
 
 # Default chunk directory, overridable via TRACELOG_CHUNK_DIR environment variable.
@@ -67,7 +95,11 @@ _DEFAULT_CHUNK_DIR = os.environ.get("TRACELOG_CHUNK_DIR", ".tracelog/chunks")
 
 
 def get_buffer(
-    capacity: int = 200, max_chunks: int = 50, chunk_dir: Optional[str] = None
+    capacity: int = 200,
+    max_chunks: int = 50,
+    chunk_dir: Optional[str] = None,
+    chunk_policy: str = "drop_oldest",
+    min_level: int = 0,
 ) -> ChunkBuffer:
     """Return the ChunkBuffer bound to the current execution context.
 
@@ -81,20 +113,81 @@ def get_buffer(
         chunk_dir: Path to directory for storing flush chunks. Defaults to
             the ``TRACELOG_CHUNK_DIR`` environment variable, or ``.tracelog/chunks``
             if the variable is not set.
+        chunk_policy: ``"drop_oldest"`` or ``"drop_newest"``; see ChunkBuffer.
+        min_level: Level below which producers skip writing; see
+            ``ChunkBuffer.accepts()``.
 
     Returns:
         The ChunkBuffer associated with the current execution context.
     """
-    try:
-        return _buffer_var.get()
-    except LookupError:
+    # A default avoids raising LookupError on the first call in each context.
+    buf = _buffer_get(None)
+    if buf is None:
         resolved_dir = chunk_dir if chunk_dir is not None else _DEFAULT_CHUNK_DIR
         buf = ChunkBuffer(
-            capacity=capacity, max_chunks=max_chunks, chunk_dir=resolved_dir
+            capacity=capacity,
+            max_chunks=max_chunks,
+            chunk_dir=resolved_dir,
+            chunk_policy=chunk_policy,
+            min_level=min_level,
         )
         _buffer_var.set(buf)
         _register_buffer(buf)
-        return buf
+    return buf
+
+
+# Sort key for merging LogEntry tuples from every buffer (field 0).
+_timestamp = itemgetter(0)
+
+# Records at or above this level are dumped immediately.
+_ERROR = logging.ERROR
+
+# Trace-DSL prefix (including the trailing space) for each standard level.
+# Custom levels are computed by ``_dsl_prefix()`` on first use and then
+# cached here too.
+_PREFIXES = {
+    logging.CRITICAL: "!! ",
+    logging.ERROR: "!! ",
+    logging.WARNING: ".. ",
+    logging.INFO: ".. [INFO] ",
+    logging.DEBUG: ".. [DEBUG] ",
+}
+
+
+# Call depth maintained by @trace, read straight from its ContextVar so each
+# record costs one C call rather than two Python-level method calls.
+_depth_get = ContextManager._depth.get
+
+# Precomputed indentation strings ("", "  ", "    ", ...) by call depth.
+# Deeper stacks fall back to building the string.
+_INDENT_DEPTHS = 64
+_INDENTS = tuple("  " * depth for depth in range(_INDENT_DEPTHS))
+
+
+def _dsl_prefix(record: logging.LogRecord) -> str:
+    """Return the Trace-DSL prefix for a level that is not in ``_PREFIXES``."""
+    if record.levelno >= logging.ERROR:
+        return "!! "
+    if record.levelno >= logging.WARNING:
+        return ".. "
+    return f".. [{record.levelname}] "
+
+
+def _render_message(head: str, msg, args) -> str:
+    """Render a deferred log message the same way ``LogRecord.getMessage()`` does.
+
+    Used by ``TraceLogHandler(lazy_format=True)``: ``head`` is the already
+    computed indent/prefix, and ``msg % args`` runs only when the entry is
+    read back for a dump. A malformed format string must not break the dump
+    of every other entry, so formatting errors fall back to the raw message.
+    """
+    msg = str(msg)
+    if args:
+        try:
+            msg = msg % args
+        except Exception:
+            msg = f"{msg} {args!r}"
+    return head + msg
 
 
 class TraceLogHandler(logging.Handler):
@@ -112,10 +205,15 @@ class TraceLogHandler(logging.Handler):
         exported as one combined Trace-DSL dump.
 
     Thread-safety:
-        The parent class ``logging.Handler`` wraps emit() with acquire()/release()
-        around a threading.RLock, so concurrent emit() calls are serialized.
-        Buffer isolation across threads is handled by the ContextVar in get_buffer().
-        The global registry is protected by _registry_lock.
+        Unlike a stock ``logging.Handler``, emit() is NOT serialized by a
+        handler-wide RLock (``createLock()`` installs no lock). On the
+        non-error path emit() only pushes to the context-local ChunkBuffer,
+        but an ERROR in any thread flashes *every* registered buffer while
+        their owner threads keep pushing. That cross-thread access is made
+        safe by each ChunkBuffer's own lock, which contends only with the
+        buffer's owner. Draining and exporting run under ``_dump_lock`` so
+        that concurrent ERRORs export one after another. The global registry
+        is protected by _registry_lock.
 
     Example:
         >>> import logging
@@ -133,6 +231,9 @@ class TraceLogHandler(logging.Handler):
         chunk_dir: str = ".tracelog/chunks",
         dump_stream=None,
         exporter: Optional[TraceExporter] = None,
+        lazy_format: bool = False,
+        buffer_level: int = logging.NOTSET,
+        chunk_policy: str = "drop_oldest",
     ) -> None:
         """Initialise the handler with buffer limits and a dump exporter.
 
@@ -145,29 +246,89 @@ class TraceLogHandler(logging.Handler):
                 Kept for backward compatibility.
             exporter: A TraceExporter instance that receives the flushed entries
                 on each ERROR dump. Defaults to StreamExporter(sys.stderr).
+            lazy_format: If True, buffer the raw ``record.msg``/``record.args``
+                of records below ERROR and only apply ``msg % args`` when the
+                entry is dumped. Error-free runs then skip message formatting
+                entirely; ERROR records, which are dumped at once, are
+                formatted eagerly. Because formatting
+                is deferred, mutable arguments are rendered with their state at
+                dump time rather than at log time. Defaults to False.
+            buffer_level: Records below this level are neither formatted nor
+                buffered. Unlike ``setLevel()``, ERROR and above always reach
+                the buffer and trigger a dump regardless of this threshold.
+                The threshold is also given to buffers this handler creates,
+                so ``@trace`` skips its DEBUG ``>>``/``<<`` lines (and their
+                argument ``repr()``) when it is above DEBUG.
+                Defaults to ``logging.NOTSET`` (buffer everything).
+            chunk_policy: Which chunks to give up once ``max_chunks`` is
+                reached: ``"drop_oldest"`` (default) or ``"drop_newest"``,
+                which keeps the beginning of the request where the root
+                cause usually is. See ChunkBuffer.
         """
         super().__init__()
         self._capacity = capacity
         self._max_chunks = max_chunks
         self._chunk_dir = chunk_dir
+        self._chunk_policy = chunk_policy
         if exporter is not None:
             self._exporter: TraceExporter = exporter
         else:
-            import sys
             self._exporter = StreamExporter(stream=dump_stream or sys.stderr)
-        self._ctx = ContextManager()
+        self._lazy_format = lazy_format
+        self._buffer_level = buffer_level
+        self._dump_lock = threading.Lock()
+        # Per-thread "inside _dump()" flag; see _dump().
+        self._dumping = threading.local()
+        _handlers.add(self)
 
     # ---------------------------------------------------------------------- #
     # Public interface
     # ---------------------------------------------------------------------- #
 
+    def createLock(self) -> None:
+        """Install no handler-wide I/O lock; see the class docstring.
+
+        ``logging.Handler.acquire()``/``release()`` are no-ops while
+        ``self.lock`` is None. Because logging then has no lock to re-create
+        after ``os.fork()``, the handler's own locks are re-created by
+        ``_reinit_locks_after_fork()``.
+        """
+        self.lock = None
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Filter and emit ``record`` without taking a handler-wide lock.
+
+        Mirrors ``logging.Handler.handle()`` minus the ``self.lock`` block,
+        which newer Python versions enter with ``with self.lock:`` and would
+        therefore fail on a None lock. The filter chain is only run when
+        filters are attached. The handler level needs no check here:
+        ``Logger.callHandlers()`` compares it before calling ``handle()``.
+
+        Args:
+            record: The LogRecord produced by the logging framework.
+
+        Returns:
+            The result of ``filter()``: falsy if the record was dropped.
+        """
+        if not self.filters:
+            self.emit(record)
+            return True
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+
     def emit(self, record: logging.LogRecord) -> None:
         """Process a single log record.
 
-        Called automatically by the logging framework (after locking) for every
-        record that passes this handler's level filter.
+        Called automatically by the logging framework for every record that
+        passes this handler's level filter.
 
         Behaviour:
+            0. Return immediately if the record is below ``buffer_level`` and
+               below ERROR — nothing is formatted or buffered.
             1. Convert ``record`` to a Trace-DSL line via ``_to_dsl()``.
             2. Append the DSL line to the current thread's ChunkBuffer.
             3. If the record's level is ERROR or above, invoke ``_dump()`` to
@@ -176,18 +337,48 @@ class TraceLogHandler(logging.Handler):
         Args:
             record: The LogRecord produced by the logging framework.
         """
+        levelno = record.levelno
+        is_error = levelno >= _ERROR
+        if levelno < self._buffer_level and not is_error:
+            return
         try:
-            buf = get_buffer(self._capacity, self._max_chunks, self._chunk_dir)
-            dsl_line = self._to_dsl(record)
-            buf.push(dsl_line, level=record.levelno)
-
-            if record.levelno >= logging.ERROR:
+            buf = get_buffer(
+                self._capacity,
+                self._max_chunks,
+                self._chunk_dir,
+                self._chunk_policy,
+                self._buffer_level,
+            )
+            # An ERROR is dumped right away, and a message without args has
+            # nothing to format, so deferring either would only add the
+            # deferred tuple.
+            if self._lazy_format and not is_error and record.args:
+                head = self._dsl_head(record)
+                dsl_line = (_render_message, head, record.msg, record.args)
+            else:
+                dsl_line = self._to_dsl(record)
+            buf.push(dsl_line, levelno)
+
+            if is_error:
                 self._dump()
         except Exception:
-            import traceback
             traceback.print_exc()
             self.handleError(record)
 
+    def close(self) -> None:
+        """Close the exporter, then the handler.
+
+        Called by ``logging.shutdown()`` at interpreter exit, so exporters that
+        buffer or queue dumps (e.g. ``AsyncExporter``) get to finish them.
+        Duck-typed exporters that only implement ``export()`` are skipped.
+        """
+        try:
+            close = getattr(self._exporter, "close", None)
+            if close is not None:
+                close()
+        finally:
+            super().close()
+
     # ---------------------------------------------------------------------- #
     # Private helpers
     # ---------------------------------------------------------------------- #
@@ -208,39 +399,63 @@ class TraceLogHandler(logging.Handler):
         Returns:
             A formatted Trace-DSL string, indented by the current call depth.
         """
-        depth = self._ctx.get_depth()
-        indent = "  " * depth
+        msg = record.msg
+        if record.args or msg.__class__ is not str:
+            msg = record.getMessage()
+        return self._dsl_head(record) + msg
 
-        if record.levelno >= logging.ERROR:
-            prefix = "!!"
-        elif record.levelno >= logging.WARNING:
-            prefix = ".."
-        else:
-            prefix = f".. [{record.levelname}]"
+    def _dsl_head(self, record: logging.LogRecord) -> str:
+        """Return the indent, DSL prefix, and optional exception name for a record.
+
+        This is everything in the Trace-DSL line that precedes the message,
+        e.g. ``"  .. [INFO] "`` or ``"!! ValueError: "``.
+
+        Args:
+            record: The LogRecord to convert.
 
-        msg = record.getMessage()
+        Returns:
+            The line head, ending in a single space.
+        """
+        depth = _depth_get()
+        indent = _INDENTS[depth] if depth < _INDENT_DEPTHS else "  " * depth
+        prefix = _PREFIXES.get(record.levelno)
+        if prefix is None:
+            prefix = _PREFIXES[record.levelno] = _dsl_prefix(record)
 
         if record.exc_info and record.exc_info[1]:
             exc = record.exc_info[1]
-            return f"{indent}{prefix} {type(exc).__name__}: {msg}"
+            return f"{indent}{prefix}{type(exc).__name__}: "
 
-        return f"{indent}{prefix} {msg}"
+        return indent + prefix
 
     def _dump(self) -> None:
         """Drain ALL registered thread buffers, merge by timestamp, export once.
 
-        Takes a snapshot of the global buffer registry under lock, then flashes
-        every live buffer. Entries are sorted by monotonic timestamp to produce
+        Runs under ``_dump_lock`` so concurrent ERRORs do not interleave their
+        drains or exports. Takes a snapshot of the global buffer registry under
+        lock, then flashes every live buffer. Entries are sorted by monotonic timestamp to produce
         the true chronological execution narrative across all threads.
-        """
-        with _registry_lock:
-            refs = list(_buffer_registry)
 
-        all_entries: list[LogEntry] = []
-        for ref in refs:
-            b = ref()
-            if b is not None:
-                all_entries.extend(b.flash())
-
-        all_entries.sort(key=lambda e: e.timestamp)
-        self._exporter.export(all_entries)
+        An ERROR logged by this thread while it is already dumping (from the
+        exporter, or from a deferred ``__str__``/``__repr__`` rendered by
+        ``flash()``) skips the nested dump: ``_dump_lock`` is not reentrant,
+        and a nested dump could recurse through the exporter without end.
+        The nested entry stays buffered and goes out with the next dump.
+        """
+        dumping = self._dumping
+        if getattr(dumping, "active", False):
+            return
+        dumping.active = True
+        try:
+            with self._dump_lock:
+                with _registry_lock:
+                    buffers = list(_buffer_registry)
+
+                all_entries: list[LogEntry] = []
+                for b in buffers:
+                    all_entries.extend(b.flash())
+
+                all_entries.sort(key=_timestamp)
+                self._exporter.export(all_entries)
+        finally:
+            dumping.active = False
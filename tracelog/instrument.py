@@ -28,22 +28,239 @@ Note:
 """
 
 import logging
-from functools import wraps
+from functools import partial, wraps
 import inspect
 from pathlib import Path
-from typing import Callable
-import uuid
+from typing import Callable, Dict, Optional
 
-from .handler import get_buffer
-from .context import ContextManager
+from .buffer import ChunkBuffer
+from .handler import _INDENT_DEPTHS, _INDENTS, get_buffer
+from .context import ContextManager, _new_id
 
-# Module-level ContextManager instance.
-# ContextManager uses contextvars internally, so this singleton is safe to share
-# across threads and async tasks — each context gets its own depth counter.
-_ctx = ContextManager()
+# The wrappers read and write ContextManager's ContextVars through these
+# bound methods: one C call per access instead of a Python-level method
+# wrapping it. They are the same ContextVars, so ContextManager stays
+# consistent with everything done here.
+_depth_get = ContextManager._depth.get
+_depth_set = ContextManager._depth.set
+_trace_id_get = ContextManager._trace_id.get
+_trace_id_set = ContextManager._trace_id.set
+_span_id_get = ContextManager._span_id.get
+_span_id_set = ContextManager._span_id.set
+_parent_span_id_get = ContextManager._parent_span_id.get
+_parent_span_id_set = ContextManager._parent_span_id.set
 
+# Levels of the >>/<< and !! lines, bound once instead of read from the
+# logging module on every call.
+_DEBUG = logging.DEBUG
+_ERROR = logging.ERROR
 
-def trace(func: Callable) -> Callable:
+
+# Longest repr() kept in >> / << lines; longer ones are cut to end in "...".
+_REPR_LIMIT = 100
+
+# Types whose repr() grows with len() and can be sliced before repr().
+_SLICEABLE = (str, bytes)
+
+# Argument types whose repr() is fully determined by an immutable value, so
+# equal (and same-typed) arguments always render identically. float is left
+# out: 0.0 == -0.0 but their reprs differ.
+_MEMO_TYPES = frozenset((int, str, bytes, bool, type(None)))
+
+# Distinct primitive-only calls remembered per function before the memo is
+# reset.
+_MEMO_SIZE = 64
+
+
+def _trunc(value) -> str:
+    """Return ``repr(value)``, cut to ``_REPR_LIMIT`` characters for the DSL line.
+
+    Strings and bytes are sliced to the limit first, so a multi-megabyte
+    payload costs the same as a short one; only the kept prefix is escaped.
+    """
+    if value.__class__ in _SLICEABLE and len(value) > _REPR_LIMIT:
+        value = value[:_REPR_LIMIT]
+    s = repr(value)
+    return s if len(s) <= _REPR_LIMIT else s[: _REPR_LIMIT - 3] + "..."
+
+
+def _bind_args(sig: Optional[inspect.Signature], args: tuple, kwargs: dict) -> str:
+    """Format a call's arguments by binding them to ``sig`` with inspect.
+
+    Returns ``"..."`` when there is no signature or the call does not match
+    it (the decorated function itself will then raise).
+    """
+    if sig is None:
+        return "..."
+    try:
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return ", ".join(
+            [f"{k}={_trunc(v)}" for k, v in bound.arguments.items() if k != "self"]
+        )
+    except Exception:
+        return "..."
+
+
+def _make_arg_formatter(
+    sig: inspect.Signature,
+) -> Optional[Callable[[tuple, dict], Optional[str]]]:
+    """Build a formatter for the ``>>`` argument list of one signature.
+
+    The formatter produces the same ``name=repr, ...`` string as binding the
+    call with ``sig.bind()`` plus ``apply_defaults()``, but only walks a tuple
+    of parameter names fixed here at decoration time. It returns None when a
+    call does not map cleanly onto those names (missing or unknown
+    arguments), leaving that call to the ``Signature.bind()`` path.
+
+    Positional calls whose values are all ``_MEMO_TYPES`` (str and bytes no
+    longer than ``_REPR_LIMIT``) are memoized per function (up to ``_MEMO_SIZE`` entries), so repeated calls with the same
+    arguments, e.g. polling or retry loops, skip the formatting entirely.
+
+    Args:
+        sig: The decorated function's signature.
+
+    Returns:
+        The formatter, or None if the signature has parameters other than
+        plain positional-or-keyword ones (``*args``, ``**kwargs``,
+        positional-only, keyword-only).
+    """
+    params = tuple(sig.parameters.values())
+    if any(p.kind is not inspect.Parameter.POSITIONAL_OR_KEYWORD for p in params):
+        return None
+
+    names = tuple(p.name for p in params)
+    labels = tuple(None if p.name == "self" else f"{p.name}=" for p in params)
+    defaults = {p.name: p.default for p in params if p.default is not p.empty}
+    count = len(names)
+    missing = object()
+
+    def format_args(args: tuple, kwargs: dict) -> Optional[str]:
+        n = len(args)
+        if n == count and not kwargs:
+            # Every parameter passed positionally: args already lines up
+            # with names, so there is nothing to look up.
+            values = args
+        else:
+            if n > count:
+                return None
+            values = list(args)
+            used = 0
+            for name in names[n:]:
+                value = kwargs.get(name, missing)
+                if value is missing:
+                    value = defaults.get(name, missing)
+                    if value is missing:
+                        return None
+                else:
+                    used += 1
+                values.append(value)
+            if used != len(kwargs):
+                return None
+        try:
+            # A list, not a generator: join() would build one from the
+            # generator anyway, after paying for resuming it per item.
+            return ", ".join([
+                label + _trunc(value)
+                for label, value in zip(labels, values)
+                if label is not None
+            ])
+        except Exception:
+            # A failing __repr__ must not break the traced call.
+            return "..."
+
+    # Calls made only with immutable, exactly-typed values render the same
+    # every time, so their argument string is memoized. Defaults are part of
+    # the output, so a mutable default disables this for the function.
+    if any(d.__class__ not in _MEMO_TYPES for d in defaults.values()):
+        return format_args
+    # A leading ``self`` is not rendered, so it is left out of the key.
+    first = 1 if labels and labels[0] is None else 0
+    cache: Dict[tuple, str] = {}
+
+    def format_args_memo(args: tuple, kwargs: dict) -> Optional[str]:
+        shown = args[first:]
+        if kwargs or len(args) < first:
+            return format_args(args, kwargs)
+        for value in shown:
+            cls = value.__class__
+            if cls not in _MEMO_TYPES:
+                return format_args(args, kwargs)
+            # Long str/bytes would pin large payloads in the memo (and hash
+            # them in full) for a repr that is truncated anyway.
+            if cls in _SLICEABLE and len(value) > _REPR_LIMIT:
+                return format_args(args, kwargs)
+        # Typed key: 1, True (and their reprs) must not share an entry.
+        key = (shown, tuple(map(type, shown)))
+        arg_str = cache.get(key)
+        if arg_str is None:
+            arg_str = format_args(args, kwargs)
+            if arg_str is not None:
+                if len(cache) >= _MEMO_SIZE:
+                    cache.clear()
+                cache[key] = arg_str
+        return arg_str
+
+    return format_args_memo
+
+
+def _render_entry(
+    indent: str,
+    head: str,
+    tail: str,
+    format_args: Optional[Callable[[tuple, dict], Optional[str]]],
+    sig: Optional[inspect.Signature],
+    args: tuple,
+    kwargs: dict,
+) -> str:
+    """Build a ``>>`` line: ``{indent}>> qualname({args}){tail}``.
+
+    Called directly on entry, or at dump time for ``@trace(lazy=True)``.
+    """
+    arg_str = None
+    if format_args is not None:
+        arg_str = format_args(args, kwargs)
+    if arg_str is None:
+        arg_str = _bind_args(sig, args, kwargs)
+    return f"{indent}{head}{arg_str}{tail}"
+
+
+def _render_return(indent: str, result) -> str:
+    """Build a ``<<`` line for a return value.
+
+    Runs at dump time for ``@trace(lazy=True)``, so a failing ``__repr__``
+    falls back to ``...`` instead of breaking the dump of every other entry.
+    """
+    try:
+        return f"{indent}<< {_trunc(result)}"
+    except Exception:
+        return f"{indent}<< ..."
+
+
+def _record_error(buf: ChunkBuffer, indent: str, exc: Exception) -> None:
+    """Record the ``!!`` line for an exception leaving a traced call.
+
+    Formatted eagerly even with ``lazy=True``: deferring it would keep the
+    traceback, and every frame it references, in the buffer.
+    """
+    buf.push(f"{indent}!! {exc.__class__.__name__}: {exc}", _ERROR)
+
+
+def _restore_context(depth: int, old_trace: str, old_span: str, old_parent: str) -> None:
+    """Restore the caller's depth and span context when a traced call exits.
+
+    Prevents the call's depth and newly generated span_id from leaking back
+    into the caller's context scope.
+    """
+    _depth_set(depth)
+    if _trace_id_get() != old_trace:
+        _trace_id_set(old_trace)
+    _span_id_set(old_span)
+    if _parent_span_id_get() != old_parent:
+        _parent_span_id_set(old_parent)
+
+
+def trace(func: Optional[Callable] = None, *, lazy: bool = False) -> Callable:
     """Decorator that records function entry, return, and exceptions as Trace-DSL.
 
     Wraps ``func`` so that every call produces structured DSL lines in the shared
@@ -57,13 +274,23 @@ def trace(func: Callable) -> Callable:
         ``{indent}!! {ExcType}: {message}`` on exception (then re-raised)
 
     Args:
-        func: The callable to wrap. Works with regular functions and methods.
-            Does *not* currently support async functions (async support is
-            planned for Phase 2).
+        func: The callable to wrap. Works with regular functions, methods,
+            and ``async def`` functions; for the latter the ``<<``/``!!``
+            lines are written when the awaited coroutine finishes. Async
+            generators are wrapped like regular functions.
+        lazy: If True (``@trace(lazy=True)``), the ``>>`` and ``<<`` lines
+            keep references to the arguments and return value and only
+            ``repr()`` them when the entries are dumped or flushed to a
+            chunk file. Calls that never end up in a dump then skip the
+            formatting entirely. Because formatting is deferred, mutable
+            arguments are rendered with their state at that later point,
+            and they stay alive while the entry is buffered. Defaults to
+            False.
 
     Returns:
         A wrapped callable with the same signature, name, and docstring as the
-        original function (preserved via ``functools.wraps``).
+        original function (preserved via ``functools.wraps``). When called
+        with only ``lazy``, a decorator that produces it.
 
     Raises:
         Any exception raised by ``func`` is re-raised unchanged after the ``!!``
@@ -81,7 +308,13 @@ def trace(func: Callable) -> Callable:
         >>>
         >>> divide(10, 2)   # writes ">> divide(a=10, b=2)" and "<< 5.0" to buffer
         5.0
+        >>>
+        >>> @trace(lazy=True)
+        ... def load(frame):
+        ...     ...
     """
+    if func is None:
+        return partial(trace, lazy=lazy)
 
     # Capture source location once at decoration time.
     try:
@@ -95,10 +328,27 @@ def trace(func: Callable) -> Callable:
     except (TypeError, OSError):
         _file_info = ""
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
+    # Everything in the entry line except the indent and the arguments is
+    # fixed per function: ">> qualname(" ... ")  [file:line]".
+    _entry_head = f">> {func.__qualname__}("
+    _entry_tail = f"){_file_info}"
+
+    # Resolve the signature once; it never changes for a given function.
+    # None means it cannot be introspected (e.g. some C-extension callables).
+    try:
+        _sig = inspect.signature(func)
+    except (TypeError, ValueError):
+        _sig = None
+    _format_args = _make_arg_formatter(_sig) if _sig is not None else None
+
+    def enter(args: tuple, kwargs: dict, clear_stale: bool) -> tuple:
+        """Open a span for one call and record its ``>>`` line.
+
+        Returns the state the exit path needs: ``(buf, indent, record_calls,
+        saved)``, where ``saved`` is passed to ``_restore_context()``.
+        """
         buf = get_buffer()
-        depth = _ctx.get_depth()
+        depth = _depth_get()
 
         # ------------------------------------------------------------------
         # CRITICAL: ThreadPoolExecutor Leak Prevention
@@ -111,14 +361,16 @@ def trace(func: Callable) -> Callable:
         # However, the parent span_id MUST still be inherited from the contextvar
         # (which was propagated by the thread pool) so we don't break the chain.
         # ------------------------------------------------------------------
-        if depth == 0:
+        if clear_stale and depth == 0:
             buf.clear()
 
-        old_trace = _ctx._trace_id.get()
-        old_span = _ctx._span_id.get()
-        old_parent = _ctx._parent_span_id.get()
+        old_trace = _trace_id_get()
+        old_span = _span_id_get()
+        old_parent = _parent_span_id_get()
 
-        indent = "  " * depth
+        # The << and !! lines reuse this indent, so the entry, return, and
+        # exception lines of one call line up.
+        indent = _INDENTS[depth] if depth < _INDENT_DEPTHS else "  " * depth
 
         # ------------------------------------------------------------------
         # Span Propagation:
@@ -126,74 +378,98 @@ def trace(func: Callable) -> Callable:
         # span inside one trace. The trace_id remains stable across nested calls,
         # while the span_id changes per invocation.
         # ------------------------------------------------------------------
-        trace_id = old_trace or _ctx.get_trace_id()
-        _ctx.set_trace_id(trace_id)
-        new_span = str(uuid.uuid4())[:8]
-        _ctx.set_span_id(new_span)
-        if old_span:
-            _ctx.set_parent_span_id(old_span)
-        elif old_parent:
-            # Preserve propagated parent linkage across thread/task boundaries.
-            _ctx.set_parent_span_id(old_parent)
-        else:
-            _ctx.set_parent_span_id("")
+        # Every ContextVar.set() allocates a Token and a new context mapping,
+        # so only values that actually change are written.
+        if not old_trace:
+            _trace_id_set(_new_id())  # start a new trace
+        _span_id_set(_new_id())
+        # The caller's span becomes the parent; without one, preserve a
+        # propagated parent linkage across thread/task boundaries.
+        new_parent = old_span or old_parent
+        if new_parent != old_parent:
+            _parent_span_id_set(new_parent)
 
         # ------------------------------------------------------------------
-        # Capture bound arguments using inspect so we get keyword-argument
-        # names even when the caller uses positional syntax.
-        # Falls back to "..." for C-extension functions or other edge cases
-        # where inspect.signature() raises TypeError.
+        # Capture bound arguments so we get keyword-argument names even when
+        # the caller uses positional syntax. Plain signatures go through the
+        # precomputed _format_args; anything else (or a call it cannot map)
+        # is bound with inspect by _bind_args.
         # ------------------------------------------------------------------
-        def _trunc(v):
-            s = repr(v)
-            return s if len(s) <= 100 else s[:97] + "..."
-
-        try:
-            sig = inspect.signature(func)
-            bound = sig.bind(*args, **kwargs)
-            bound.apply_defaults()
-            arg_str = ", ".join(
-                f"{k}={_trunc(v)}"
-                for k, v in bound.arguments.items()
-                if k != "self"
-            )
-        except Exception:
-            arg_str = "..."
-
-        # >> Entry: record before increasing depth so the entry line aligns
-        # with the caller's indentation level.
-        buf.push(f"{indent}>> {func.__qualname__}({arg_str}){_file_info}", level=logging.DEBUG)
-        _ctx.increase_depth()
+        # The >> / << lines are DEBUG entries. When the buffer is configured
+        # above DEBUG they would not be kept, so skip them — and the repr()
+        # of every argument and of the return value — entirely.
+        record_calls = buf.accepts(_DEBUG)
+
+        if record_calls:
+            # >> Entry: record before increasing depth so the entry line aligns
+            # with the caller's indentation level.
+            if lazy:
+                buf.push(
+                    (_render_entry, indent, _entry_head, _entry_tail,
+                     _format_args, _sig, args, kwargs),
+                    _DEBUG,
+                )
+            else:
+                buf.push(
+                    _render_entry(indent, _entry_head, _entry_tail,
+                                  _format_args, _sig, args, kwargs),
+                    _DEBUG,
+                )
+        _depth_set(depth + 1)
+        return buf, indent, record_calls, (depth, old_trace, old_span, old_parent)
+
+    def record_return(buf: ChunkBuffer, indent: str, result) -> None:
+        """Record the ``<<`` line for a normal return."""
+        if lazy:
+            buf.push((_render_return, indent, result), _DEBUG)
+        else:
+            buf.push(_render_return(indent, result), _DEBUG)
 
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        buf, indent, record_calls, saved = enter(args, kwargs, True)
         try:
             result = func(*args, **kwargs)
-
-            # << Normal return: decrease depth first so the return line aligns
-            # with the entry line, not the body.
-            _ctx.decrease_depth()
-            ret_indent = "  " * _ctx.get_depth()
-            buf.push(f"{ret_indent}<< {_trunc(result)}", level=logging.DEBUG)
+            if record_calls:
+                record_return(buf, indent, result)
             return result
-
         except Exception as exc:
-            # !! Exception: decrease depth to match the entry indent, then
-            # record the exception type and message before re-raising so the
-            # caller's error-handling logic is not disrupted.
-            _ctx.decrease_depth()
-            err_indent = "  " * _ctx.get_depth()
-            buf.push(
-                f"{err_indent}!! {type(exc).__name__}: {exc}",
-                level=logging.ERROR,
-            )
+            # !! Exception: record it before re-raising so the caller's
+            # error-handling logic is not disrupted.
+            _record_error(buf, indent, exc)
             raise  # Always re-raise; TraceLog must never swallow exceptions.
-
         finally:
-            # ------------------------------------------------------------------
-            # Restore previous span context to prevent leaking the newly generated
-            # span_id back to the caller's context scope.
-            # ------------------------------------------------------------------
-            _ctx.set_trace_id(old_trace)
-            _ctx.set_span_id(old_span)
-            _ctx.set_parent_span_id(old_parent)
-
-    return wrapper
+            # Also runs for BaseException (KeyboardInterrupt, GeneratorExit),
+            # so the caller never inherits this call's depth or span.
+            _restore_context(*saved)
+
+    if not inspect.iscoroutinefunction(func):
+        return wrapper
+
+    # ----------------------------------------------------------------------
+    # Coroutine functions: calling func only creates the coroutine, so the
+    # sync wrapper would write << before the body ran. This variant awaits
+    # it instead, sharing enter/record_return/_record_error/_restore_context
+    # with ``wrapper``. ContextVars follow the coroutine across awaits, so
+    # depth and span handling are unchanged.
+    #
+    # It does not clear the buffer at depth 0: sibling tasks started by
+    # asyncio.gather() run at depth 0 in copies of one context and share its
+    # buffer, so a clear would erase each other's lines. Cancellation
+    # (CancelledError is a BaseException) still restores depth in finally.
+    # ----------------------------------------------------------------------
+    @wraps(func)
+    async def async_wrapper(*args, **kwargs):
+        buf, indent, record_calls, saved = enter(args, kwargs, False)
+        try:
+            result = await func(*args, **kwargs)
+            if record_calls:
+                record_return(buf, indent, result)
+            return result
+        except Exception as exc:
+            _record_error(buf, indent, exc)
+            raise
+        finally:
+            _restore_context(*saved)
+
+    return async_wrapper